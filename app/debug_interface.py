@@ -14,6 +14,7 @@ from typing import Dict, Any, List, Tuple
 from sklearn.decomposition import PCA
 import umap
 
+from src.embeddings.embedding_store import EmbeddingStore
 from src.retrieval.search_engine import SearchEngine
 
 # Configuración de la página
@@ -71,12 +72,38 @@ def load_searcher() -> SearchEngine:
         st.error(f"Error cargando SearchEngine: {str(e)}")
         raise
 
-@st.cache_data
+# cache_resource: la matriz del almacén se comparte mapeada en memoria, sin
+# serializarla ni copiarla como haría cache_data
+@st.cache_resource
 def load_embeddings_data() -> Tuple[np.ndarray, List[Dict[str, Any]]]:
     """
-    Carga los embeddings y metadatos desde el índice FAISS optimizado.
-    NUEVA VERSIÓN: Usa el mismo índice FAISS que SearchEngine para consistencia.
+    Carga los embeddings y metadatos desde el almacén consolidado (memory-map) o,
+    si no existe, desde el índice FAISS optimizado que usa SearchEngine.
+    Las filas del almacén están en el mismo orden que los IDs del índice.
     """
+    store = EmbeddingStore("data/embeddings/store")
+    if store.exists() and store.num_rows > 0:
+        try:
+            all_metadata = []
+            chunks = store.iter_chunks()
+            faiss_id = 0
+            for document in store.documents:
+                for i in range(document['count']):
+                    chunk = next(chunks)
+                    all_metadata.append({
+                        'filename': document['filename'],
+                        'chunk': f"Chunk {faiss_id+1}",
+                        'metadata': {**document['metadata'], **chunk, 'chunk_index': i},
+                        'text': chunk.get('text', ''),
+                        'faiss_id': faiss_id
+                    })
+                    faiss_id += 1
+            
+            st.success(f"✅ Cargados {store.num_rows} embeddings desde el almacén consolidado")
+            return store.vectors, all_metadata
+        except Exception as e:
+            st.warning(f"Error leyendo el almacén de embeddings, se usa el índice FAISS: {str(e)}")
+    
     try:
         # Cargar SearchEngine que tiene el índice FAISS
         searcher = SearchEngine()
@@ -65,6 +65,7 @@ if not api_key.startswith("sk-"):
     st.error("❌ La clave API no tiene el formato correcto. Debe comenzar con 'sk-'")
     st.stop()
 
+from src.data.catalog import DocumentCatalog
 from src.retrieval.search_engine import SearchEngine
 from src.generation.answer_generator import AnswerGenerator
 
@@ -141,7 +142,9 @@ def load_components():
     Carga los componentes necesarios (cacheado).
     """
     try:
-        return SearchEngine(), AnswerGenerator(api_key=api_key)
+        # ENCODER_BACKEND=onnx-int8 usa el modelo cuantizado para las consultas
+        backend = os.getenv("ENCODER_BACKEND", "torch")
+        return SearchEngine(backend=backend), AnswerGenerator(api_key=api_key)
     except Exception as e:
         logger.error(f"Error al cargar los componentes: {str(e)}")
         st.error("Error al cargar los componentes. Por favor, verifique la configuración.")
@@ -153,6 +156,15 @@ def load_metadata_options() -> Dict[str, List[str]]:
     Carga las opciones de filtrado desde los metadatos (cacheado).
     """
     try:
+        # Valores distintos de cada filtro directamente del catálogo indexado
+        catalog = DocumentCatalog("data/metadata/catalog.sqlite")
+        if catalog.exists():
+            with catalog:
+                options = catalog.facet_values()
+            if options:
+                logger.info(f"Metadatos cargados del catálogo. Campos encontrados: {list(options.keys())}")
+                return options
+        
         metadata_path = Path("models/processed_documents.json")
         if not metadata_path.exists():
             logger.error(f"No se encontró el archivo de metadatos en: {metadata_path}")
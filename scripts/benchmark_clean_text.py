@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark y comprobación de salida dorada del motor de limpieza de texto.
+
+Compara ``src.data.text_cleaning.clean_text`` con la implementación original
+línea a línea (copiada aquí como referencia) sobre los textos de data/processed
+y sobre texto sintético con ruido, y falla si alguna salida difiere.
+
+Uso:
+    python scripts/benchmark_clean_text.py [--repeat 5] [--fuzz 2000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.text_cleaning import clean_text
+
+def legacy_clean_text(text: str) -> str:
+    """Implementación original de PDFExtractor.clean_text (referencia dorada)."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        line = re.sub(r'[^\w\sáéíóúÁÉÍÓÚñÑ.,;:¿?¡!()\-]', ' ', line)
+        line = re.sub(r'([a-záéíóúñ])\s+([A-ZÁÉÍÓÚÑ])', r'\1\2', line)
+        line = re.sub(r'([a-záéíóúñ])([A-ZÁÉÍÓÚÑ])', r'\1 \2', line)
+        line = re.sub(r'(\d)([A-Za-záéíóúÁÉÍÓÚñÑ])', r'\1 \2', line)
+        line = re.sub(r'([A-Za-záéíóúÁÉÍÓÚñÑ])(\d)', r'\1 \2', line)
+        line = re.sub(r'[ \t]+', ' ', line)
+        line = re.sub(r'\s+([.,;:¿?¡!])', r'\1', line)
+        line = re.sub(r'([.,;:¿?¡!])\s+', r'\1 ', line)
+        line = re.sub(r'\(\s+', '(', line)
+        line = re.sub(r'\s+\)', ')', line)
+        line = re.sub(r'\s+-\s+', '-', line)
+        line = re.sub(r'(\d+)\s*([€$])\s*(\d*)', r'\1\2\3', line)
+        cleaned_lines.append(line.strip())
+    text = '\n'.join(cleaned_lines)
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    return text.strip()
+
+# Alfabeto con los casos límite de las reglas: mayúsculas/minúsculas acentuadas,
+# dígitos, puntuación, moneda, espacios Unicode y saltos de línea de todo tipo
+_FUZZ_ALPHABET = (
+    'aábcdeéñoóuúAÁBCÑOÓUÚ0123456789'
+    '     \t\t\n\n\n\r\x0b\x0c\x1c\x85  　'
+    '.,;:¿?¡!()-€$•*/"\'_'
+)
+
+def fuzz_samples(count: int, seed: int = 0) -> List[str]:
+    """Genera textos aleatorios con el alfabeto de casos límite."""
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(_FUZZ_ALPHABET) for _ in range(rng.randint(0, 400)))
+        for _ in range(count)
+    ]
+
+def time_function(func: Callable[[str], str], texts: List[str], repeat: int) -> float:
+    """Devuelve el mejor tiempo total (en segundos) de aplicar func a todos los textos."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del motor de limpieza de texto")
+    parser.add_argument('--processed-dir', default='data/processed')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fuzz', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = [p.read_text(encoding='utf-8') for p in sorted(Path(args.processed_dir).glob('*.txt'))]
+    # Reintroducir ruido de extracción (viñetas, símbolos, espacios) en el corpus real
+    noisy = [
+        text.replace(' ', '  ').replace('\n', ' •\n').replace('euros', '€ euros')
+        for text in corpus
+    ]
+    samples = corpus + noisy + fuzz_samples(args.fuzz)
+
+    mismatches = [i for i, text in enumerate(samples) if clean_text(text) != legacy_clean_text(text)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} salidas difieren de la referencia (primera: muestra {mismatches[0]})")
+        return 1
+    print(f"✓ Salida idéntica a la referencia en {len(samples)} muestras")
+
+    bench = corpus + noisy
+    total_mb = sum(len(t.encode('utf-8')) for t in bench) / 1e6
+    legacy_time = time_function(legacy_clean_text, bench, args.repeat)
+    new_time = time_function(clean_text, bench, args.repeat)
+    print(f"Documentos: {len(bench)} ({total_mb:.2f} MB)")
+    print(f"Original:     {legacy_time:.3f}s ({total_mb / legacy_time:.1f} MB/s)")
+    print(f"Precompilado: {new_time:.3f}s ({total_mb / new_time:.1f} MB/s)")
+    print(f"Aceleración:  x{legacy_time / new_time:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark y comprobación de concordancia de los backends del modelo de embeddings.
+
+Codifica los mismos chunks y consultas con cada backend de
+``src.embeddings.encoder_backend`` (PyTorch fp32, ONNX Runtime fp32 y ONNX
+Runtime int8) y muestra en paralelo el rendimiento de ingesta (chunks/s), la
+latencia por consulta (p50/p95) y la similitud coseno de cada vector con el de
+PyTorch. Falla si la similitud media de algún backend queda por debajo de
+--min-cosine.
+
+Los chunks se toman de data/processed si existe (divididos por secciones como en
+DocumentEmbedder); si no, se generan textos sintéticos con el estilo de un IPID.
+
+Uso:
+    python scripts/benchmark_encoder_backends.py [--chunks 256] [--queries 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.sections import DEFAULT_SCANNER
+from src.embeddings.encoder_backend import BACKENDS, load_encoder
+
+_QUERIES = [
+    "¿Qué cubre el seguro de automóvil a todo riesgo?",
+    "¿Está cubierta la rotura de lunas?",
+    "¿Cuáles son las exclusiones del seguro de responsabilidad civil?",
+    "¿Dónde estoy cubierto cuando viajo fuera de España?",
+    "¿Cómo puedo rescindir el contrato?",
+    "¿Cuándo tengo que efectuar los pagos de la prima?",
+    "¿Qué franquicia tiene la póliza del camión?",
+    "¿Incluye asistencia en viaje desde el kilómetro cero?",
+]
+
+_PHRASES = [
+    "¿Qué se asegura? Daños propios del vehículo asegurado por colisión o vuelco.",
+    "Responsabilidad civil obligatoria hasta los límites legales establecidos.",
+    "¿Qué no está asegurado? Daños causados intencionadamente por el conductor.",
+    "Rotura de lunas, incendio y robo del vehículo y sus accesorios.",
+    "¿Dónde estoy cubierto? En España y en los países del sistema de Carta Verde.",
+    "Asistencia en viaje las 24 horas desde el kilómetro cero.",
+    "El tomador deberá comunicar cualquier agravación del riesgo durante la vigencia.",
+    "La prima se abonará por anticipado y podrá fraccionarse mensualmente.",
+]
+
+def load_chunks(count: int, seed: int = 0) -> List[str]:
+    """Obtiene chunks de secciones de los textos procesados o sintéticos."""
+    chunks = []
+    for path in sorted(Path("data/processed").glob("*.txt")):
+        text = path.read_text(encoding='utf-8')
+        matches = list(DEFAULT_SCANNER.finditer(text))
+        for i, (start, _, _, _) in enumerate(matches):
+            end = matches[i + 1][0] if i + 1 < len(matches) else len(text)
+            chunks.append(text[start:end].strip())
+        if len(chunks) >= count:
+            return chunks[:count]
+
+    rng = random.Random(seed)
+    while len(chunks) < count:
+        chunks.append(' '.join(rng.choice(_PHRASES) for _ in range(rng.randint(2, 30))))
+    return chunks
+
+def row_cosines(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Similitud coseno fila a fila entre dos matrices de embeddings."""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de los backends del modelo de embeddings")
+    parser.add_argument('--model', default="paraphrase-multilingual-mpnet-base-v2",
+                        help="Modelo de Sentence Transformers")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS),
+                        help="Backends a comparar (el primero es la referencia)")
+    parser.add_argument('--chunks', type=int, default=256, help="Chunks para medir la ingesta")
+    parser.add_argument('--queries', type=int, default=50, help="Consultas para medir la latencia")
+    parser.add_argument('--batch-size', type=int, default=32, help="Chunks por lote en la ingesta")
+    parser.add_argument('--min-cosine', type=float, default=0.98,
+                        help="Similitud coseno media mínima con la referencia")
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.chunks)
+    queries = [_QUERIES[i % len(_QUERIES)] for i in range(args.queries)]
+
+    results: Dict[str, Dict] = {}
+    for backend in args.backends:
+        model = load_encoder(args.model, backend, device='cpu')
+        # Calentamiento (carga de sesiones y asignación de memoria)
+        model.encode(chunks[:args.batch_size], batch_size=args.batch_size)
+
+        start = time.perf_counter()
+        chunk_embeddings = model.encode(chunks, batch_size=args.batch_size, convert_to_numpy=True)
+        ingest = time.perf_counter() - start
+
+        latencies = []
+        query_embeddings = []
+        for query in queries:
+            start = time.perf_counter()
+            query_embeddings.append(model.encode([query], convert_to_numpy=True)[0])
+            latencies.append(time.perf_counter() - start)
+
+        results[backend] = {
+            'throughput': len(chunks) / ingest,
+            'p50': np.percentile(latencies, 50) * 1000,
+            'p95': np.percentile(latencies, 95) * 1000,
+            'chunks': chunk_embeddings,
+            'queries': np.stack(query_embeddings)
+        }
+
+    reference = args.backends[0]
+    print(f"Modelo: {args.model} - {len(chunks)} chunks, {len(queries)} consultas (referencia: {reference})")
+    print(f"{'Backend':<10} {'chunks/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'cos medio':>10} {'cos mín':>8}")
+    failed = False
+    for backend, result in results.items():
+        cosines = np.concatenate([
+            row_cosines(results[reference]['chunks'], result['chunks']),
+            row_cosines(results[reference]['queries'], result['queries'])
+        ])
+        failed |= cosines.mean() < args.min_cosine
+        print(
+            f"{backend:<10} {result['throughput']:9.1f} {result['p50']:8.1f} {result['p95']:8.1f} "
+            f"{cosines.mean():10.4f} {cosines.min():8.4f}"
+        )
+
+    if failed:
+        print(f"ERROR: similitud coseno media por debajo de {args.min_cosine}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
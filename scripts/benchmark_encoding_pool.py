@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Informe de rendimiento del pool de codificación multiproceso.
+
+Codifica los mismos chunks con distintos repartos procesos x hilos de
+``src.embeddings.encoding_pool.EncodingPool`` y muestra chunks/s y la mejora
+respecto al primer reparto, para elegir la combinación de cada máquina
+(p. ej. 1x8, 2x4, 4x2 y 8x1 en 8 núcleos). Los procesos se arrancan y calientan
+antes de medir, como en una ingesta larga en la que se reutilizan.
+
+Uso:
+    python scripts/benchmark_encoding_pool.py [--grid 1x8 2x4 4x2 8x1] [--chunks 1024]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_encoder_backends import load_chunks
+from src.embeddings.encoder_backend import BACKENDS
+from src.embeddings.encoding_pool import EncodingPool
+
+def default_grid() -> List[str]:
+    """Repartos procesos x hilos que ocupan todos los núcleos."""
+    cores = os.cpu_count() or 1
+    return [f"{workers}x{cores // workers}" for workers in (1, 2, 4, 8) if workers <= cores]
+
+def parse_split(split: str) -> Tuple[int, int]:
+    """Convierte 'PxH' en (procesos, hilos)."""
+    workers, threads = split.lower().split('x')
+    return int(workers), int(threads)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rendimiento del pool de codificación")
+    parser.add_argument('--model', default="paraphrase-multilingual-mpnet-base-v2",
+                        help="Modelo de Sentence Transformers")
+    parser.add_argument('--backend', choices=BACKENDS, default='torch', help="Backend de inferencia")
+    parser.add_argument('--grid', nargs='+', default=default_grid(),
+                        help="Repartos procesos x hilos a medir (p. ej. 2x4)")
+    parser.add_argument('--chunks', type=int, default=1024, help="Chunks a codificar")
+    parser.add_argument('--batch-size', type=int, default=64, help="Chunks por lote")
+    args = parser.parse_args()
+
+    chunks = sorted(load_chunks(args.chunks), key=len, reverse=True)
+    batches = [chunks[i:i + args.batch_size] for i in range(0, len(chunks), args.batch_size)]
+
+    print(f"Modelo: {args.model} ({args.backend}) - {len(chunks)} chunks en lotes de {args.batch_size}")
+    print(f"{'Reparto':<9} {'chunks/s':>9} {'mejora':>7}")
+    baseline = None
+    for split in args.grid:
+        workers, threads = parse_split(split)
+        with EncodingPool(args.model, args.backend, workers, threads) as pool:
+            # Calentamiento: cada proceso carga el modelo y codifica un lote
+            list(pool.imap([batches[-1]] * workers))
+
+            start = time.perf_counter()
+            for _ in pool.imap(batches):
+                pass
+            throughput = len(chunks) / (time.perf_counter() - start)
+
+        baseline = baseline or throughput
+        print(f"{split:<9} {throughput:9.1f} {throughput / baseline:6.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
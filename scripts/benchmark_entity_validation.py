@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark y comprobación de equivalencia de la validación de entidades.
+
+Compara ``src.data.entity_validator.EntityValidator`` con la implementación
+original de MetadataGenerator.is_valid_entity (copiada aquí como referencia)
+sobre un documento sintético con muchas entidades, como los que produce spaCy en
+condicionados largos: organizaciones y ciudades conocidas, nombres propios,
+términos de seguros en mayúsculas, números y entidades con puntuación, con
+muchas repeticiones. Falla si algún resultado difiere.
+
+Uso:
+    python scripts/benchmark_entity_validation.py [--entities 20000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.entity_validator import (
+    ENTITY_PATTERNS, KNOWN_LOCATIONS, KNOWN_ORGANIZATIONS, STOP_ENTITIES, EntityValidator
+)
+
+def legacy_is_valid_entity(entity: str, entity_type: str) -> bool:
+    """Implementación original de MetadataGenerator.is_valid_entity (referencia)."""
+    entity_lower = entity.lower()
+    if entity_lower in STOP_ENTITIES.get(entity_type, set()):
+        return False
+    words = entity_lower.split()
+    if len(words) > 1:
+        if all(word in STOP_ENTITIES.get(entity_type, set()) for word in words):
+            return False
+    if len(entity) < 3:
+        return False
+    if entity.isdigit():
+        return False
+    if entity.isupper() and len(entity) < 5:
+        return False
+    if entity[0].isupper() and entity[1:].islower() and len(entity) < 5:
+        return False
+    if re.search(r'[^\w\s]', entity):
+        return False
+    if entity_type in ENTITY_PATTERNS:
+        if not re.match(ENTITY_PATTERNS[entity_type], entity):
+            return False
+    if entity_type == 'ORG':
+        return entity in KNOWN_ORGANIZATIONS
+    elif entity_type == 'LOC':
+        return entity in KNOWN_LOCATIONS
+    elif entity_type == 'PER':
+        common_words = {'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'de', 'del',
+                      'convenio', 'complementario', 'sanitarios', 'intereses'}
+        words = entity_lower.split()
+        return not any(word in common_words for word in words)
+    return True
+
+_NAMES = ['Juan', 'María', 'Pedro', 'Lucía', 'Antonio', 'Carmen', 'Gómez', 'Pérez', 'Ruiz']
+_TERMS = ['Tomador', 'Asegurado', 'Convenio Complementario', 'Carta Verde', 'Seguro',
+          'Responsabilidad Civil', 'Reaseguros', 'Lunas', 'Póliza', 'Inter-Bureaux']
+
+def synthetic_entities(count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Genera (entidad, etiqueta) con la mezcla y las repeticiones típicas de spaCy."""
+    rng = random.Random(seed)
+    vocabulary = (
+        list(KNOWN_ORGANIZATIONS) + list(KNOWN_LOCATIONS) + _TERMS
+        + [f"{rng.choice(_NAMES)} {rng.choice(_NAMES)}" for _ in range(200)]
+        + [str(rng.randint(1, 99999)) for _ in range(50)]
+        + ['AXA S.A.', 'Art. 5', 'el Asegurado', 'CCS', 'Zurich Insurance', 'UE', 'de la Póliza']
+        + [''.join(rng.choice('abcdefgh') for _ in range(rng.randint(3, 10))).capitalize()
+           for _ in range(300)]
+    )
+    labels = ['ORG', 'PER', 'LOC', 'MISC']
+    return [(rng.choice(vocabulary), rng.choice(labels)) for _ in range(count)]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de validación de entidades")
+    parser.add_argument('--entities', type=int, default=20000, help="Entidades del documento sintético")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    entities = synthetic_entities(args.entities)
+
+    validator = EntityValidator()
+    mismatches = [
+        (entity, label) for entity, label in entities
+        if legacy_is_valid_entity(entity, label) != validator.is_valid(entity, label)
+    ]
+    if mismatches:
+        print(f"ERROR: {len(mismatches)} resultados distintos, p. ej. {mismatches[:5]}")
+        return 1
+
+    def best_time(func) -> float:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for entity, label in entities:
+                func(entity, label)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    legacy = best_time(legacy_is_valid_entity)
+    # Validador nuevo en frío (memoización vacía en cada repetición) y en caliente
+    cold_timings = []
+    for _ in range(args.repeat):
+        cold_validator = EntityValidator()
+        start = time.perf_counter()
+        for entity, label in entities:
+            cold_validator.is_valid(entity, label)
+        cold_timings.append(time.perf_counter() - start)
+    cold = min(cold_timings)
+    warm = best_time(validator.is_valid)
+
+    n = len(entities)
+    print(f"Entidades: {n} ({len(set(entities))} distintas), resultados idénticos")
+    print(f"Original:          {legacy * 1e9 / n:8.0f} ns/entidad")
+    print(f"Validador (frío):  {cold * 1e9 / n:8.0f} ns/entidad  ({legacy / cold:.1f}x)")
+    print(f"Validador (caché): {warm * 1e9 / n:8.0f} ns/entidad  ({legacy / warm:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark de rendimiento de la extracción de texto (src/data/extract_text.py).
+
+Genera localmente PDFs sintéticos parecidos a los IPID (dos columnas, pie de
+página y encabezados de sección como "¿Qué se asegura?") con PyMuPDF y mide:
+
+- split:    desglose en proceso de parseo/maquetación, limpieza y detección de idioma
+- serial:   PDFExtractor.process_all_pdfs con un solo proceso
+- parallel: PDFExtractor.process_all_pdfs con varios procesos
+
+Para cada modo se informa de páginas/s, MB/s, memoria residente máxima y el
+desglose parseo/limpieza/idioma (en serial y parallel, tiempo acumulado de todos
+los procesos de trabajo). Cada modo se ejecuta en un subproceso propio para que
+el pico de memoria sea limpio.
+
+Uso:
+    python scripts/benchmark_extraction.py --docs 50 --pages 4 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SECTION_HEADINGS = [
+    "¿En qué consiste este tipo de seguro?",
+    "¿Qué se asegura?",
+    "¿Qué no está asegurado?",
+    "Sumas aseguradas",
+    "¿Existen restricciones en lo que respecta a la cobertura?",
+    "¿Dónde estoy cubierto?",
+    "¿Cuáles son mis obligaciones?",
+    "¿Cuándo y cómo tengo que efectuar los pagos?",
+    "¿Cuándo comienza y finaliza la cobertura?",
+    "¿Cómo puedo rescindir el contrato?",
+]
+
+VOCABULARY = (
+    "seguro póliza tomador asegurado vehículo cobertura indemnización daños "
+    "responsabilidad civil obligatoria voluntaria franquicia robo incendio lunas "
+    "asistencia viaje defensa jurídica reclamación siniestro conductor ocupantes "
+    "accidentes invalidez permanente fallecimiento prima anual fraccionada euros "
+    "territorio España Unión Europea contrato vigencia renovación rescisión"
+).split()
+
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 40
+
+def _paragraph(rng: random.Random) -> str:
+    """Genera un párrafo con viñetas e importes, como los de un IPID."""
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(20, 45))]
+    amount = f"{rng.randint(1, 500) * 100}€"
+    return "• " + " ".join(words).capitalize() + f" hasta {amount}."
+
+def generate_corpus(output_dir: Path, num_docs: int, num_pages: int, seed: int = 0) -> List[Path]:
+    """
+    Genera PDFs sintéticos de dos columnas con encabezados de sección y pie de página.
+
+    Args:
+        output_dir: Directorio donde guardar los PDFs
+        num_docs: Número de documentos
+        num_pages: Páginas por documento
+        seed: Semilla para que el corpus sea reproducible
+
+    Returns:
+        Lista de rutas de los PDFs generados
+    """
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    column_width = (PAGE_WIDTH - 3 * MARGIN) / 2
+    paths = []
+    for doc_index in range(num_docs):
+        doc = fitz.open()
+        for page_index in range(num_pages):
+            page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            page.insert_text(
+                (MARGIN, 50),
+                f"Seguro de Automóvil - Documento de información {doc_index}",
+                fontsize=12
+            )
+            for column in range(2):
+                x0 = MARGIN + column * (column_width + MARGIN)
+                heading = SECTION_HEADINGS[(page_index * 2 + column) % len(SECTION_HEADINGS)]
+                body = "\n".join(_paragraph(rng) for _ in range(4))
+                page.insert_textbox(
+                    fitz.Rect(x0, 80, x0 + column_width, PAGE_HEIGHT - 90),
+                    f"{heading}\n{body}",
+                    fontsize=9
+                )
+            # Pie de página que la maquetación debe descartar
+            page.insert_text(
+                (MARGIN, PAGE_HEIGHT - 40),
+                f"Allianz Seguros y Reaseguros S.A. - Página {page_index + 1} de {num_pages}",
+                fontsize=7
+            )
+        path = output_dir / f"ipid-sintetico-{doc_index:05d}.pdf"
+        doc.save(str(path))
+        doc.close()
+        paths.append(path)
+    return paths
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Memoria residente máxima del proceso y de sus hijos, en MB."""
+    try:
+        import resource
+        scale = 1024 if sys.platform != 'darwin' else 1
+        return {
+            'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6,
+            'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 1e6,
+        }
+    except ImportError:
+        # Windows: solo la memoria actual, aproximación al pico
+        import psutil
+        return {'self': psutil.Process().memory_info().rss / 1e6, 'children': 0.0}
+
+def run_split(pdf_dir: Path) -> Dict:
+    """Mide por separado parseo/maquetación, limpieza y detección de idioma."""
+    import fitz  # PyMuPDF
+    from src.data.language_detection import detect_languages
+    from src.data.page_layout import layout_page_text
+    from src.data.text_cleaning import clean_text
+
+    timings = {'parse': 0.0, 'clean': 0.0, 'language': 0.0}
+    samples = []
+    pages = 0
+    for pdf_path in sorted(pdf_dir.glob('*.pdf')):
+        start = time.perf_counter()
+        raw_pages = []
+        with fitz.open(str(pdf_path)) as doc:
+            for page in doc:
+                raw_pages.append(layout_page_text(
+                    page.get_text("blocks"), page.rect.width, page.rect.height
+                ))
+        timings['parse'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned = [clean_text(text) for text in raw_pages]
+        timings['clean'] += time.perf_counter() - start
+
+        pages += len(raw_pages)
+        samples.append("\n".join(cleaned)[:1000])
+
+    start = time.perf_counter()
+    detect_languages(samples)
+    timings['language'] += time.perf_counter() - start
+
+    return {'pages': pages, 'seconds': sum(timings.values()), 'split': timings}
+
+def instrument_extractor() -> Dict[str, float]:
+    """
+    Instrumenta PDFExtractor para medir parseo/maquetación, limpieza e idioma.
+
+    Cada documento lleva en su metadata ('stage_seconds') el tiempo dentro de
+    iter_pages sin la limpieza y el de la limpieza, medidos en el proceso que lo
+    extrae; la detección de idioma se hace en el proceso principal. Los procesos
+    de trabajo heredan la instrumentación con fork, así que debe llamarse antes
+    de crear el pool.
+
+    Returns:
+        Diccionario donde se acumula el tiempo de detección de idioma
+    """
+    import src.data.extract_text as extract_text
+
+    extractor_class = extract_text.PDFExtractor
+    stages = {'parse': 0.0, 'clean': 0.0}
+    language = {'language': 0.0}
+    clean_text = extractor_class.clean_text
+    iter_pages = extractor_class.iter_pages
+    extract_to_stream = extractor_class._extract_to_stream
+    detect_languages = extract_text.detect_languages
+
+    def timed_clean_text(self, text):
+        start = time.perf_counter()
+        try:
+            return clean_text(self, text)
+        finally:
+            stages['clean'] += time.perf_counter() - start
+
+    def timed_iter_pages(self, *args, **kwargs):
+        pages = iter_pages(self, *args, **kwargs)
+        while True:
+            start = time.perf_counter()
+            try:
+                page = next(pages)
+            except StopIteration:
+                stages['parse'] += time.perf_counter() - start
+                return
+            stages['parse'] += time.perf_counter() - start
+            yield page
+
+    def timed_extract_to_stream(self, *args, **kwargs):
+        stages.update(parse=0.0, clean=0.0)
+        metadata, sample = extract_to_stream(self, *args, **kwargs)
+        # El tiempo de iter_pages incluye la limpieza de cada página
+        metadata['stage_seconds'] = {
+            'parse': stages['parse'] - stages['clean'],
+            'clean': stages['clean']
+        }
+        return metadata, sample
+
+    def timed_detect_languages(samples):
+        start = time.perf_counter()
+        try:
+            return detect_languages(list(samples))
+        finally:
+            language['language'] += time.perf_counter() - start
+
+    extractor_class.clean_text = timed_clean_text
+    extractor_class.iter_pages = timed_iter_pages
+    extractor_class._extract_to_stream = timed_extract_to_stream
+    extract_text.detect_languages = timed_detect_languages
+    return language
+
+def run_extractor(pdf_dir: Path, workers: int) -> Dict:
+    """Ejecuta PDFExtractor.process_all_pdfs completo sobre el corpus sintético."""
+    from src.data.extract_text import PDFExtractor
+
+    # La instrumentación llega a los procesos de trabajo solo si se crean con fork
+    split_available = 'fork' in multiprocessing.get_all_start_methods()
+    if split_available:
+        multiprocessing.set_start_method('fork', force=True)
+        language = instrument_extractor()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        extractor = PDFExtractor(
+            raw_dir=str(pdf_dir),
+            processed_dir=str(Path(work_dir) / 'processed'),
+            metadata_dir=str(Path(work_dir) / 'metadata'),
+            n_workers=workers,
+            layout_cache_dir=None
+        )
+        start = time.perf_counter()
+        metadata_df = extractor.process_all_pdfs(incremental=False)
+        seconds = time.perf_counter() - start
+
+    result = {'pages': int(metadata_df['num_pages'].sum()), 'seconds': seconds}
+    if split_available:
+        stage_seconds = [stages for stages in metadata_df['stage_seconds'] if isinstance(stages, dict)]
+        result['split'] = {
+            'parse': sum(stages['parse'] for stages in stage_seconds),
+            'clean': sum(stages['clean'] for stages in stage_seconds),
+            'language': language['language']
+        }
+    return result
+
+def run_mode(mode: str, pdf_dir: Path, workers: int) -> Dict:
+    """Ejecuta un modo y añade las métricas de rendimiento."""
+    if mode == 'split':
+        result = run_split(pdf_dir)
+    elif mode == 'serial':
+        result = run_extractor(pdf_dir, workers=1)
+    else:
+        result = run_extractor(pdf_dir, workers=workers)
+
+    total_mb = sum(p.stat().st_size for p in pdf_dir.glob('*.pdf')) / 1e6
+    result.update({
+        'mode': mode,
+        'mb': total_mb,
+        'pages_per_s': result['pages'] / result['seconds'],
+        'mb_per_s': total_mb / result['seconds'],
+        'peak_rss_mb': peak_rss_mb(),
+    })
+    return result
+
+def print_report(results: List[Dict]) -> None:
+    """Imprime la tabla de resultados."""
+    print(f"\n{'Modo':<10}{'Páginas':>9}{'Seg.':>9}{'Pág/s':>9}{'MB/s':>8}{'RSS MB':>9}{'RSS hijos':>11}")
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['pages']:>9}{r['seconds']:>9.2f}{r['pages_per_s']:>9.1f}"
+            f"{r['mb_per_s']:>8.2f}{r['peak_rss_mb']['self']:>9.0f}{r['peak_rss_mb']['children']:>11.0f}"
+        )
+    print()
+    for r in results:
+        if 'split' in r:
+            total = sum(r['split'].values()) or 1.0
+            print(f"Desglose ({r['mode']}): " + ", ".join(
+                f"{stage} {seconds:.2f}s ({100 * seconds / total:.0f}%)"
+                for stage, seconds in r['split'].items()
+            ))
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de texto de PDFs")
+    parser.add_argument('--docs', type=int, default=50, help="Número de PDFs sintéticos")
+    parser.add_argument('--pages', type=int, default=4, help="Páginas por PDF")
+    parser.add_argument('--workers', type=int, default=4, help="Procesos del modo paralelo")
+    parser.add_argument('--modes', default='split,serial,parallel')
+    parser.add_argument('--pdf-dir', default=None, help="Reutilizar un corpus ya generado")
+    parser.add_argument('--mode', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Ejecución interna de un único modo (en subproceso)
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, Path(args.pdf_dir), args.workers)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_dir = Path(args.pdf_dir) if args.pdf_dir else Path(tmp) / 'raw'
+        if not args.pdf_dir:
+            start = time.perf_counter()
+            generate_corpus(pdf_dir, args.docs, args.pages)
+            print(f"Corpus sintético: {args.docs} PDFs x {args.pages} páginas "
+                  f"({time.perf_counter() - start:.1f}s)")
+
+        results = []
+        for mode in args.modes.split(','):
+            completed = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--pdf-dir', str(pdf_dir),
+                 '--workers', str(args.workers)],
+                capture_output=True, text=True, check=True
+            )
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        print_report(results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
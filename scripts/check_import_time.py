@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Mide el tiempo de importación de los puntos de entrada de la ingesta.
+
+Importa cada módulo en un intérprete limpio con ``python -X importtime`` y
+compara el tiempo acumulado con su presupuesto. Muestra además los imports más
+costosos para localizar dependencias pesadas que se cargan sin necesidad
+(torch, spaCy, pandas...).
+
+Uso:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --top 15 --repeat 5
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Presupuesto de importación por punto de entrada (milisegundos)
+BUDGETS_MS: Dict[str, float] = {
+    'src.data.extract_text': 300,
+    'src.data.metadata_generator': 300,
+    'src.embeddings.embed_documents': 400,
+}
+
+# Módulos que ninguno de los puntos de entrada debe cargar al importarse
+FORBIDDEN_MODULES = ['torch', 'sentence_transformers', 'spacy', 'pandas', 'fitz']
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Importa un módulo en un subproceso con -X importtime.
+
+    Args:
+        module: Nombre del módulo a importar
+
+    Returns:
+        Tuple: tiempo acumulado del módulo en ms y lista (ms acumulados, módulo) de cada import
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        error = [l for l in completed.stderr.splitlines() if not l.startswith('import time:')]
+        raise RuntimeError(f"No se pudo importar {module}:\n" + "\n".join(error[-5:]))
+
+    imports = []
+    total_ms = 0.0
+    for line in completed.stderr.splitlines():
+        # Formato: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        cumulative_ms = int(cumulative) / 1000
+        name = name.strip()
+        imports.append((cumulative_ms, name))
+        if name == module:
+            total_ms = cumulative_ms
+    return total_ms, imports
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de importación")
+    parser.add_argument('--top', type=int, default=10, help="Imports más costosos a mostrar")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repeticiones por módulo (se toma la mejor)")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module, budget_ms in BUDGETS_MS.items():
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        total_ms, imports = min(runs, key=lambda run: run[0])
+        loaded = {name for _, name in imports}
+        forbidden = [name for name in FORBIDDEN_MODULES if name in loaded]
+
+        status = "OK" if total_ms <= budget_ms and not forbidden else "EXCEDIDO"
+        over_budget |= status != "OK"
+        print(f"\n{module}: {total_ms:.0f} ms (presupuesto {budget_ms:.0f} ms) [{status}]")
+        if forbidden:
+            print(f"  Dependencias pesadas cargadas al importar: {', '.join(forbidden)}")
+        # Solo paquetes de primer nivel para no repetir submódulos
+        top_level = sorted((i for i in imports if '.' not in i[1].strip()), reverse=True)
+        for cumulative_ms, name in top_level[:args.top]:
+            print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
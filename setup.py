@@ -14,7 +14,7 @@ setup(
         "huggingface-hub>=0.16.4",
         
         # PDF processing
-        "pdfplumber>=0.11.6",
+        "PyMuPDF>=1.23.8",
         
         # Web interface
         "streamlit>=1.28.0",
@@ -28,11 +28,20 @@ setup(
         "tqdm>=4.65.0",
         "psutil>=5.9.5",
         "pandas>=2.0.0",
+        "scikit-learn>=1.2.2",
         
         # NLP
-        "spacy>=3.7.2"
+        "spacy>=3.7.2",
+        "langdetect>=1.0.9"
     ],
     extras_require={
+        "parquet": [
+            "pyarrow>=14.0.0"
+        ],
+        "onnx": [
+            "onnxruntime>=1.21",
+            "optimum>=1.24"
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",
@@ -0,0 +1,252 @@
+"""
+Catálogo indexado de documentos (SQLite).
+
+Lo genera la etapa de metadatos (MetadataGenerator) y lo consultan el generador
+de embeddings, el constructor del índice y la interfaz web. Cada documento es una
+fila con campos tipados, el hash del texto del que se generó y su nombre
+normalizado, con índices para las búsquedas por nombre y por los campos que se
+usan como filtros: cada consulta es una búsqueda indexada en lugar de un
+recorrido completo de metadata.csv.
+"""
+
+import json
+import sqlite3
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+def normalize_name(filename: str) -> str:
+    """
+    Normaliza un nombre de archivo para emparejar textos, PDFs y metadatos.
+
+    Elimina la extensión (.txt, .pdf...), acentos y caracteres no ASCII.
+
+    Args:
+        filename: Nombre del archivo, con o sin extensión
+
+    Returns:
+        Nombre normalizado
+    """
+    normalized = unicodedata.normalize('NFKD', Path(filename).stem)
+    return normalized.encode('ASCII', 'ignore').decode('ASCII')
+
+class DocumentCatalog:
+    """
+    Catálogo de metadatos de documentos en SQLite.
+    """
+
+    # Campos de metadatos con columna propia (el resto se guarda en 'extra')
+    FIELDS = (
+        'filename', 'producto', 'insurance_type', 'file_path', 'coverage_type',
+        'num_pages', 'keywords', 'title', 'insurer', 'document_date',
+        'document_version', 'language'
+    )
+
+    # Campos del esquema básico, que se devuelven siempre (None si faltan)
+    REQUIRED_FIELDS = (
+        'filename', 'producto', 'insurance_type', 'file_path', 'coverage_type',
+        'num_pages', 'keywords'
+    )
+
+    # Campos categóricos que se ofrecen como filtros en la interfaz (rutas,
+    # recuentos y palabras clave tienen un valor distinto por documento)
+    FACET_FIELDS = ('filename', 'producto', 'insurance_type', 'coverage_type')
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            doc_id TEXT PRIMARY KEY,
+            normalized_name TEXT NOT NULL,
+            content_hash TEXT,
+            filename TEXT NOT NULL,
+            producto TEXT,
+            insurance_type TEXT,
+            file_path TEXT,
+            coverage_type TEXT,
+            num_pages INTEGER,
+            keywords TEXT,
+            title TEXT,
+            insurer TEXT,
+            document_date TEXT,
+            document_version TEXT,
+            language TEXT,
+            chunks TEXT,
+            extra TEXT,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_documents_normalized_name ON documents (normalized_name);
+        CREATE INDEX IF NOT EXISTS idx_documents_insurance_type ON documents (insurance_type);
+        CREATE INDEX IF NOT EXISTS idx_documents_coverage_type ON documents (coverage_type);
+        CREATE INDEX IF NOT EXISTS idx_documents_producto ON documents (producto);
+    """
+
+    def __init__(self, path: str = 'data/metadata/catalog.sqlite'):
+        """
+        Args:
+            path: Ruta de la base de datos SQLite
+        """
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def exists(self) -> bool:
+        """Indica si el catálogo existe en disco."""
+        return self.path.exists()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexión abierta bajo demanda (se crea el esquema si no existe)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # La interfaz web puede consultar desde otros hilos
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(self._SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'DocumentCatalog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _to_row(self, metadata: Dict, content_hash: Optional[str]) -> Dict:
+        """Convierte un diccionario de metadatos en una fila de la tabla."""
+        doc_id = Path(metadata['filename']).stem
+        row = {field: metadata.get(field) for field in self.FIELDS}
+        if row['num_pages'] is not None:
+            try:
+                row['num_pages'] = int(row['num_pages'])
+            except (TypeError, ValueError):
+                row['num_pages'] = None
+        extra = {
+            key: value for key, value in metadata.items()
+            if key not in self.FIELDS and key != 'chunks'
+        }
+        row.update({
+            'doc_id': doc_id,
+            'normalized_name': normalize_name(doc_id),
+            'content_hash': content_hash,
+            'chunks': json.dumps(metadata['chunks'], ensure_ascii=False) if 'chunks' in metadata else None,
+            'extra': json.dumps(extra, ensure_ascii=False) if extra else None,
+            'updated_at': datetime.now().isoformat()
+        })
+        return row
+
+    def _from_row(self, row: sqlite3.Row) -> Dict:
+        """Reconstruye el diccionario de metadatos de una fila."""
+        # Los campos del esquema básico se devuelven siempre (None si faltan)
+        metadata = {
+            field: row[field] for field in self.FIELDS
+            if row[field] is not None or field in self.REQUIRED_FIELDS
+        }
+        if row['extra']:
+            metadata.update(json.loads(row['extra']))
+        if row['chunks']:
+            metadata['chunks'] = json.loads(row['chunks'])
+        return metadata
+
+    def upsert_many(self, documents: Iterable[Tuple[Dict, Optional[str]]]) -> int:
+        """
+        Inserta o actualiza documentos en una sola transacción.
+
+        Args:
+            documents: Pares (metadatos, hash del texto)
+
+        Returns:
+            Número de documentos escritos
+        """
+        rows = [self._to_row(metadata, content_hash) for metadata, content_hash in documents]
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        placeholders = ', '.join(f':{column}' for column in columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO documents ({', '.join(columns)}) VALUES ({placeholders})",
+                rows
+            )
+        return len(rows)
+
+    def sync(self, documents: Iterable[Tuple[Dict, Optional[str]]]) -> None:
+        """
+        Deja el catálogo con exactamente estos documentos (upsert + borrado del resto).
+
+        Args:
+            documents: Pares (metadatos, hash del texto)
+        """
+        documents = list(documents)
+        keep = [Path(metadata['filename']).stem for metadata, _ in documents]
+        self.upsert_many(documents)
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (doc_id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM keep_ids")
+            self.conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", [(d,) for d in keep])
+            self.conn.execute("DELETE FROM documents WHERE doc_id NOT IN (SELECT doc_id FROM keep_ids)")
+
+    def get(self, doc_id: str) -> Optional[Dict]:
+        """
+        Obtiene los metadatos de un documento.
+
+        Args:
+            doc_id: Nombre del documento sin extensión
+
+        Returns:
+            Diccionario de metadatos o None si no está en el catálogo
+        """
+        row = self.conn.execute("SELECT * FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def find_by_name(self, filename: str) -> List[Dict]:
+        """
+        Busca documentos por nombre normalizado (sin acentos ni extensión).
+
+        Args:
+            filename: Nombre de archivo (.txt, .pdf o sin extensión)
+
+        Returns:
+            Metadatos de los documentos cuyo nombre normalizado coincide
+        """
+        rows = self.conn.execute(
+            "SELECT * FROM documents WHERE normalized_name = ? ORDER BY doc_id",
+            (normalize_name(filename),)
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def iter_documents(self) -> Iterator[Dict]:
+        """Recorre los metadatos de todos los documentos en orden de doc_id."""
+        for row in self.conn.execute("SELECT * FROM documents ORDER BY doc_id"):
+            yield self._from_row(row)
+
+    def count(self) -> int:
+        """Número de documentos del catálogo."""
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def facet_values(self, fields: Sequence[str] = FACET_FIELDS) -> Dict[str, List[str]]:
+        """
+        Valores distintos de los campos usados como filtros.
+
+        El nombre de archivo se devuelve sin extensión, como en los metadatos del índice.
+
+        Args:
+            fields: Campos a consultar (deben ser columnas del catálogo)
+
+        Returns:
+            Diccionario campo -> valores distintos ordenados (como texto)
+        """
+        facets = {}
+        for field in fields:
+            if field not in self.FIELDS:
+                raise ValueError(f"Campo no disponible en el catálogo: {field}")
+            column = 'doc_id' if field == 'filename' else field
+            values = self.conn.execute(
+                f"SELECT DISTINCT {column} FROM documents WHERE {column} IS NOT NULL AND {column} != ''"
+            ).fetchall()
+            if values:
+                facets[field] = sorted(str(value[0]) for value in values)
+        return facets
@@ -0,0 +1,203 @@
+"""
+Análisis lingüístico de un documento a partir de un único parse de spaCy.
+
+Entidades, lemas, palabras clave y recuentos de tokens salen del mismo ``Doc``,
+y el resultado se guarda en una caché en disco indexada por el hash del texto,
+de modo que volver a generar metadatos sobre textos sin cambios no requiere
+ningún parse. La clave de la caché incluye el modelo y los componentes
+desactivados: un análisis hecho sin ``ner`` no tiene entidades (``entities`` es
+None) y nunca se sirve a un pipeline que sí las extrae.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Etiquetas de entidades que se conservan del parse
+ENTITY_LABELS = ('ORG', 'PER', 'LOC', 'MISC')
+
+class DocumentAnalysis:
+    """
+    Resultado del análisis de un documento.
+    """
+
+    # Versión del análisis; cambiarla invalida la caché
+    VERSION = "2"
+
+    def __init__(
+        self,
+        content_hash: str,
+        entities: Optional[List[Tuple[str, str]]],
+        lemmas: List[str],
+        keywords: List[str],
+        num_tokens: int,
+        num_words: int
+    ):
+        """
+        Args:
+            content_hash: SHA-256 del texto analizado
+            entities: Entidades (texto, etiqueta) únicas en orden de aparición, sin
+                validar; None si el parse se hizo sin ner
+            lemmas: Lemas en minúsculas de las palabras de contenido, en orden
+                (con repeticiones, útil para estadísticas de corpus)
+            keywords: Lemas únicos ordenados de las palabras de más de 3 letras
+            num_tokens: Número total de tokens
+            num_words: Número de tokens alfabéticos
+        """
+        self.content_hash = content_hash
+        self.entities = entities
+        self.lemmas = lemmas
+        self.keywords = keywords
+        self.num_tokens = num_tokens
+        self.num_words = num_words
+
+    @classmethod
+    def from_doc(cls, doc, content_hash: str, with_entities: bool = True) -> 'DocumentAnalysis':
+        """
+        Construye el análisis a partir de un Doc de spaCy.
+
+        Args:
+            doc: Doc de spaCy del texto original (sin pasar a minúsculas)
+            content_hash: SHA-256 del texto
+            with_entities: Si el pipeline tenía ner activo (si no, entities es None)
+
+        Returns:
+            DocumentAnalysis del documento
+        """
+        entities = [] if with_entities else None
+        seen = set()
+        for ent in doc.ents if with_entities else ():
+            entity = (ent.text.strip(), ent.label_)
+            if ent.label_ in ENTITY_LABELS and entity[0] and entity not in seen:
+                seen.add(entity)
+                entities.append(entity)
+
+        lemmas = []
+        keywords = set()
+        num_words = 0
+        for token in doc:
+            if not token.is_alpha:
+                continue
+            num_words += 1
+            if token.is_stop:
+                continue
+            lemma = token.lemma_.lower()
+            lemmas.append(lemma)
+            if len(token.text) > 3:
+                keywords.add(lemma)
+
+        return cls(
+            content_hash=content_hash,
+            entities=entities,
+            lemmas=lemmas,
+            keywords=sorted(keywords),
+            num_tokens=len(doc),
+            num_words=num_words
+        )
+
+    def keyword_lemmas(self) -> List[str]:
+        """Lemas del documento (con repeticiones) restringidos a las palabras clave candidatas."""
+        candidates = set(self.keywords)
+        return [lemma for lemma in self.lemmas if lemma in candidates]
+
+    def entities_by_label(self) -> Dict[str, List[str]]:
+        """
+        Agrupa los textos de las entidades por etiqueta.
+
+        Raises:
+            ValueError: Si el análisis se hizo sin ner
+        """
+        if self.entities is None:
+            raise ValueError("El análisis se hizo sin ner y no tiene entidades")
+        grouped: Dict[str, List[str]] = {label: [] for label in ENTITY_LABELS}
+        for text, label in self.entities:
+            grouped[label].append(text)
+        return grouped
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.VERSION,
+            'content_hash': self.content_hash,
+            'entities': None if self.entities is None else [list(entity) for entity in self.entities],
+            'lemmas': self.lemmas,
+            'keywords': self.keywords,
+            'num_tokens': self.num_tokens,
+            'num_words': self.num_words,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DocumentAnalysis':
+        return cls(
+            content_hash=data['content_hash'],
+            entities=None if data['entities'] is None else [tuple(entity) for entity in data['entities']],
+            lemmas=data['lemmas'],
+            keywords=data['keywords'],
+            num_tokens=data['num_tokens'],
+            num_words=data['num_words']
+        )
+
+class AnalysisCache:
+    """
+    Caché en disco de análisis, un archivo JSON por hash de contenido.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = 'data/cache/analysis',
+        model_name: str = '',
+        disabled_pipes: Sequence[str] = ()
+    ):
+        """
+        Args:
+            cache_dir: Directorio de la caché
+            model_name: Identificador del modelo de spaCy (nombre y versión)
+            disabled_pipes: Componentes desactivados en el parse; un análisis hecho
+                con otro modelo u otros componentes se considera inválido
+        """
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        if disabled_pipes:
+            self.model_name += f"-sin-{','.join(sorted(disabled_pipes))}"
+
+    def _path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}.json"
+
+    def get(self, content_hash: str) -> Optional[DocumentAnalysis]:
+        """
+        Recupera el análisis de un texto si está en caché y es vigente.
+
+        Args:
+            content_hash: SHA-256 del texto
+
+        Returns:
+            DocumentAnalysis o None si no está o fue generado con otro modelo/versión
+        """
+        path = self._path(content_hash)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != DocumentAnalysis.VERSION or data.get('model') != self.model_name:
+            return None
+        return DocumentAnalysis.from_dict(data)
+
+    def put(self, analysis: DocumentAnalysis) -> None:
+        """Guarda un análisis (escritura atómica)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = analysis.to_dict()
+        data['model'] = self.model_name
+        path = self._path(analysis.content_hash)
+        tmp_path = path.with_suffix('.json.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el análisis en caché {path}: {str(e)}")
@@ -0,0 +1,173 @@
+"""
+Validación rápida de las entidades nombradas detectadas por spaCy.
+
+Las reglas son las de MetadataGenerator.is_valid_entity, pero las tablas se
+normalizan una sola vez (frozensets en minúsculas, expresiones precompiladas) y:
+
+- ORG y LOC solo admiten entidades de una lista cerrada, así que las reglas se
+  aplican de antemano a esa lista y validar es una búsqueda en un conjunto.
+- El resto de tipos se valida con las reglas y el resultado se memoriza por
+  (entidad, tipo): en un documento las mismas entidades se repiten mucho.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+# Palabras comunes que no deben ser consideradas como entidades
+STOP_ENTITIES: Dict[str, Set[str]] = {
+    'ORG': {'además', 'subsidio', 'seguro', 'póliza', 'contrato', 'documento', 'cláusula', 
+           'condición', 'artículo', 'sección', 'apartado', 'inciso', 'literal', 'documento',
+           'comunicar', 'anticipación', 'convenio', 'complementario', 'inter-bureaux',
+           'espacio', 'económico', 'europeo', 'entidad', 'sanitarios', 'daños', 'intereses',
+           'carta', 'verde', 'civil', 'obligatoria', 'compañía', 'complementaria',
+           'condiciones', 'particulares', 'cristales', 'fondos', 'pensiones', 'física',
+           'permanente', 'indemnización', 'lunas', 'nacionales', 'naturaleza', 'reaseguros',
+           'reclamación', 'tomador', 'circulación', 'conducción', 'asegurado', 'incendio',
+           'responsabilidad', 'red', 'asesoramiento', 'convenio complementario'},
+    'PER': {'asegurado', 'beneficiario', 'tomador', 'perjudicado', 'tercero', 'usuario',
+           'convenio', 'complementario', 'sanitarios', 'intereses', 'convenio complementario'},
+    'LOC': {'domicilio', 'residencia', 'dirección', 'localidad', 'municipio', 'provincia',
+           'ciudad', 'vaticano', 'españa', 'gibraltar', 'mónaco', 'san marino',
+           'aseguradora', 'carta', 'verde', 'civil', 'obligatoria', 'complementaria',
+           'comunicar', 'condiciones', 'particulares', 'cristales', 'lunas', 'nacionales',
+           'naturaleza', 'reaseguros', 'tomador', 'incendio'}
+}
+
+# Patrones para validar entidades
+ENTITY_PATTERNS = {
+    'ORG': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',  # Palabras con inicial mayúscula
+    'PER': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',  # Nombres propios
+    'LOC': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$'   # Nombres de lugares
+}
+
+# Lista de organizaciones conocidas
+KNOWN_ORGANIZATIONS = {
+    'Mapfre', 'AXA', 'Allianz', 'Generali', 'Zurich', 'Liberty', 'Reale', 
+    'Helvetia', 'Pelayo', 'Mutua Madrileña'
+}
+
+# Lista de ubicaciones conocidas
+KNOWN_LOCATIONS = {
+    'Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Zaragoza', 'Málaga',
+    'Murcia', 'Palma', 'Las Palmas', 'Bilbao', 'Alicante', 'Córdoba',
+    'Valladolid', 'Vigo', 'Gijón', 'Hospitalet', 'Vitoria', 'Elche',
+    'Granada', 'Terrassa', 'A Coruña', 'Cartagena', 'Sabadell', 'Santa Cruz',
+    'Oviedo', 'Móstoles', 'Pamplona', 'Santander', 'Castellón', 'Almería'
+}
+
+# Palabras que descartan una entidad de tipo PER
+PERSON_COMMON_WORDS = {
+    'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'de', 'del',
+    'convenio', 'complementario', 'sanitarios', 'intereses'
+}
+
+# Tipos que solo admiten entidades de una lista cerrada
+_CLOSED_TYPES = ('ORG', 'LOC')
+
+class EntityValidator:
+    """
+    Validador de entidades con tablas precalculadas y memoización.
+    """
+
+    # Entradas máximas de la memoización antes de vaciarla
+    MAX_CACHE_SIZE = 100_000
+
+    def __init__(
+        self,
+        stop_entities: Optional[Dict[str, Iterable[str]]] = None,
+        entity_patterns: Optional[Dict[str, str]] = None,
+        known_organizations: Optional[Iterable[str]] = None,
+        known_locations: Optional[Iterable[str]] = None,
+        common_words: Optional[Iterable[str]] = None
+    ):
+        """
+        Construye las tablas de validación.
+
+        Args:
+            stop_entities: Palabras a ignorar por tipo de entidad
+            entity_patterns: Patrón regex que debe cumplir cada tipo de entidad
+            known_organizations: Organizaciones admitidas como ORG
+            known_locations: Ubicaciones admitidas como LOC
+            common_words: Palabras que descartan una entidad PER
+        """
+        stop_entities = STOP_ENTITIES if stop_entities is None else stop_entities
+        entity_patterns = ENTITY_PATTERNS if entity_patterns is None else entity_patterns
+
+        self._stop: Dict[str, FrozenSet[str]] = {
+            entity_type: frozenset(word.lower() for word in words)
+            for entity_type, words in stop_entities.items()
+        }
+        self._patterns = {
+            entity_type: re.compile(pattern) for entity_type, pattern in entity_patterns.items()
+        }
+        self._special_chars = re.compile(r'[^\w\s]')
+        self._common_words = frozenset(
+            PERSON_COMMON_WORDS if common_words is None else common_words
+        )
+
+        known = {
+            'ORG': KNOWN_ORGANIZATIONS if known_organizations is None else known_organizations,
+            'LOC': KNOWN_LOCATIONS if known_locations is None else known_locations,
+        }
+        # Las reglas generales se aplican una vez a las listas cerradas
+        self._closed: Dict[str, FrozenSet[str]] = {
+            entity_type: frozenset(e for e in known[entity_type] if self._passes_rules(e, entity_type))
+            for entity_type in _CLOSED_TYPES
+        }
+        self._cache: Dict[tuple, bool] = {}
+
+    def _passes_rules(self, entity: str, entity_type: str) -> bool:
+        """Reglas generales comunes a todos los tipos de entidad."""
+        entity_lower = entity.lower()
+        stop = self._stop.get(entity_type, frozenset())
+
+        # Palabra a ignorar o combinación de palabras a ignorar
+        if entity_lower in stop:
+            return False
+        words = entity_lower.split()
+        if len(words) > 1 and all(word in stop for word in words):
+            return False
+
+        # Longitud mínima, números y palabras comunes cortas
+        if len(entity) < 3 or entity.isdigit():
+            return False
+        if len(entity) < 5 and (entity.isupper() or (entity[0].isupper() and entity[1:].islower())):
+            return False
+
+        # Caracteres especiales y patrón esperado para el tipo
+        if self._special_chars.search(entity):
+            return False
+        pattern = self._patterns.get(entity_type)
+        if pattern is not None and not pattern.match(entity):
+            return False
+        return True
+
+    def _validate(self, entity: str, entity_type: str) -> bool:
+        """Aplica todas las reglas sin memoización."""
+        closed = self._closed.get(entity_type)
+        if closed is not None:
+            return entity in closed
+        if not self._passes_rules(entity, entity_type):
+            return False
+        if entity_type == 'PER':
+            return not any(word in self._common_words for word in entity.lower().split())
+        return True
+
+    def is_valid(self, entity: str, entity_type: str) -> bool:
+        """
+        Verifica si una entidad es válida.
+
+        Args:
+            entity: Texto de la entidad
+            entity_type: Tipo de entidad (ORG, PER, LOC, MISC)
+
+        Returns:
+            bool: True si la entidad es válida
+        """
+        key = (entity, entity_type)
+        result = self._cache.get(key)
+        if result is None:
+            if len(self._cache) >= self.MAX_CACHE_SIZE:
+                self._cache.clear()
+            result = self._cache[key] = self._validate(entity, entity_type)
+        return result
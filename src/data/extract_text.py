@@ -1,16 +1,24 @@
+import io
 import os
+import argparse
 import logging
-import re
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, TextIO, Tuple
 
-import pandas as pd
-import PyPDF2
-import pdfplumber
-import spacy
 from tqdm import tqdm
-import fitz  # PyMuPDF
+
+from src.data.extraction_store import ExtractionStore, ExtractionStoreWriter
+from src.data.language_detection import detect_language, detect_languages
+from src.data.manifest import file_sha256, load_manifest, save_manifest
+from src.data.page_layout import LayoutCacheWriter, iter_cached_pages, layout_page_text
+from src.data.text_cleaning import clean_text
+from src.data.worker_pool import SupervisedPool, TaskFailure
+
+# pandas y PyMuPDF se importan solo en las rutas que los usan para que
+# `--help` o una ejecución incremental sin cambios arranquen rápido
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configuración del logging
 logging.basicConfig(
@@ -23,96 +31,173 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Caracteres iniciales del documento usados para detectar el idioma
+LANGUAGE_SAMPLE_SIZE = 1000
+
+# Extractor propio de cada proceso de trabajo (se inicializa una sola vez por worker)
+_worker_extractor: Optional['PDFExtractor'] = None
+
+def _init_worker(extractor_kwargs: Dict) -> None:
+    """Crea el extractor una única vez en el proceso de trabajo."""
+    global _worker_extractor
+    _worker_extractor = PDFExtractor(**extractor_kwargs)
+
+def _process_pdf_in_worker(task: Tuple[Path, Optional[str]]) -> Tuple[Dict, str, Optional[List[Tuple[int, str]]]]:
+    """Procesa un PDF (ruta y hash de contenido) con el extractor del proceso de trabajo."""
+    pdf_path, sha256 = task
+    return _worker_extractor._process_pdf(pdf_path, sha256)
+
 class PDFExtractor:
-    def __init__(self, raw_dir: str = 'data/raw', processed_dir: str = 'data/processed'):
+    # Versión del extractor; cambiarla fuerza la re-extracción en modo incremental
+    EXTRACTOR_VERSION = "2"
+    
+    # Formatos de salida: un .txt por PDF, almacén columnar Parquet o ambos
+    OUTPUT_FORMATS = ('txt', 'parquet', 'both')
+    
+    def __init__(
+        self,
+        raw_dir: str = 'data/raw',
+        processed_dir: str = 'data/processed',
+        n_workers: int = 1,
+        metadata_dir: str = 'data/metadata',
+        task_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        output_format: str = 'txt',
+        margin_bottom: float = 70,
+        column_split: float = 0.5,
+        layout_cache_dir: Optional[str] = 'data/cache/layout'
+    ):
         """
         Inicializa el extractor de PDFs.
         
         Args:
             raw_dir: Directorio que contiene los PDFs originales
             processed_dir: Directorio donde se guardarán los textos extraídos
+            n_workers: Número de procesos para la extracción (1 = secuencial,
+                None = todos los núcleos disponibles)
+            metadata_dir: Directorio para el CSV de metadata y el manifiesto
+            task_timeout: Tiempo máximo en segundos por PDF; si se indica, la
+                extracción se ejecuta en procesos supervisados aunque n_workers sea 1
+            memory_limit_mb: Memoria residente máxima por proceso de extracción en MB
+            output_format: 'txt' (un archivo por PDF), 'parquet' (almacén columnar en
+                processed_dir/corpus, requiere pyarrow) o 'both'
+            margin_bottom: Altura del pie de página a descartar (en puntos)
+            column_split: División entre columnas como fracción del ancho de página
+            layout_cache_dir: Directorio de la caché de geometría de bloques
+                (None = leer siempre del PDF)
         """
+        if output_format not in self.OUTPUT_FORMATS:
+            raise ValueError(f"Formato de salida no soportado: {output_format}")
+        
         self.raw_dir = Path(raw_dir)
         self.processed_dir = Path(processed_dir)
         self.processed_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Cargar el modelo de spaCy para detección de idioma
-        try:
-            self.nlp = spacy.load('es_core_news_sm')
-        except OSError:
-            logger.error("No se pudo cargar el modelo de spaCy. Asegúrate de haberlo instalado.")
-            raise
+        self.metadata_dir = Path(metadata_dir)
+        self.manifest_path = self.metadata_dir / 'extraction_manifest.json'
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.output_format = output_format
+        self.write_txt = output_format != 'parquet'
+        self.store = ExtractionStore(self.processed_dir / 'corpus') if output_format != 'txt' else None
+        self.margin_bottom = margin_bottom
+        self.column_split = column_split
+        self.layout_cache_dir = Path(layout_cache_dir) if layout_cache_dir else None
+
+    def _worker_kwargs(self) -> Dict:
+        """Argumentos para reconstruir este extractor en un proceso de trabajo."""
+        return {
+            'raw_dir': str(self.raw_dir),
+            'processed_dir': str(self.processed_dir),
+            'metadata_dir': str(self.metadata_dir),
+            'output_format': self.output_format,
+            'margin_bottom': self.margin_bottom,
+            'column_split': self.column_split,
+            'layout_cache_dir': str(self.layout_cache_dir) if self.layout_cache_dir else None
+        }
+
+    def _layout_params(self) -> Dict:
+        """Parámetros de maquetación; si cambian, hay que volver a maquetar."""
+        return {'margin_bottom': self.margin_bottom, 'column_split': self.column_split}
 
     def clean_text(self, text: str) -> str:
         """
         Limpia el texto extraído del PDF preservando los retornos de carro.
         
+        Usa el motor precompilado de src.data.text_cleaning, que procesa el
+        documento completo en pocas pasadas (ver scripts/benchmark_clean_text.py).
+        
         Args:
             text: Texto a limpiar
             
         Returns:
             Texto limpio
         """
-        # Normalizar retornos de carro
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Dividir el texto en líneas para procesarlas individualmente
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # Reemplazar caracteres especiales manteniendo puntuación básica
-            line = re.sub(r'[^\w\sáéíóúÁÉÍÓÚñÑ.,;:¿?¡!()\-]', ' ', line)
-            
-            # Corregir palabras separadas incorrectamente
-            line = re.sub(r'([a-záéíóúñ])\s+([A-ZÁÉÍÓÚÑ])', r'\1\2', line)
-            
-            # Corregir palabras unidas incorrectamente
-            line = re.sub(r'([a-záéíóúñ])([A-ZÁÉÍÓÚÑ])', r'\1 \2', line)
-            
-            # Corregir números y símbolos
-            line = re.sub(r'(\d)([A-Za-záéíóúÁÉÍÓÚñÑ])', r'\1 \2', line)
-            line = re.sub(r'([A-Za-záéíóúÁÉÍÓÚñÑ])(\d)', r'\1 \2', line)
-            
-            # Eliminar espacios múltiples
-            line = re.sub(r'[ \t]+', ' ', line)
-            
-            # Corregir espacios alrededor de puntuación
-            line = re.sub(r'\s+([.,;:¿?¡!])', r'\1', line)
-            line = re.sub(r'([.,;:¿?¡!])\s+', r'\1 ', line)
-            
-            # Corregir espacios en paréntesis
-            line = re.sub(r'\(\s+', '(', line)
-            line = re.sub(r'\s+\)', ')', line)
-            
-            # Corregir espacios en guiones
-            line = re.sub(r'\s+-\s+', '-', line)
-            
-            # Corregir espacios en números y símbolos de moneda
-            line = re.sub(r'(\d+)\s*([€$])\s*(\d*)', r'\1\2\3', line)
-            
-            # Agregar la línea limpia
-            cleaned_lines.append(line.strip())
-        
-        # Unir las líneas con retornos de carro
-        text = '\n'.join(cleaned_lines)
-        
-        # Eliminar líneas vacías múltiples
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        
-        return text.strip()
+        return clean_text(text)
 
-    def extract_text_from_pdf(self, pdf_path: Path) -> Tuple[str, Dict]:
+    def _layout_cache_path(self, sha256: str) -> Path:
+        """Ruta de la caché de geometría de un PDF, indexada por hash de contenido."""
+        return self.layout_cache_dir / f"{sha256}.layout"
+
+    def iter_pages(self, pdf_path: Path, sha256: Optional[str] = None) -> Iterator[Tuple[int, str]]:
         """
-        Extrae el texto de un archivo PDF usando PyMuPDF (fitz) y lógica de bloques para separar columnas y eliminar pies de página.
+        Genera el texto limpio de un PDF página a página, sin cargar el documento completo.
+        
+        Con la caché de maquetación activa, la geometría de bloques se lee del PDF una
+        sola vez y se guarda página a página mientras se extrae; las ejecuciones
+        posteriores (p. ej. con otro margin_bottom o column_split) solo re-ejecutan la
+        maquetación leyendo la caché también página a página.
         
         Args:
             pdf_path: Ruta al archivo PDF
+            sha256: Hash del PDF si ya se calculó (si no, se calcula para la caché)
             
-        Returns:
-            Tuple[str, Dict]: Texto extraído y metadata del proceso
+        Yields:
+            Tuple[int, str]: Número de página (desde 1) y texto limpio de la página
         """
-        metadata = {
+        cache_path = None
+        if self.layout_cache_dir is not None:
+            cache_path = self._layout_cache_path(sha256 or file_sha256(pdf_path))
+        # Páginas ya entregadas desde la caché si esta resulta estar dañada a mitad
+        yielded = 0
+        if cache_path is not None and cache_path.exists():
+            try:
+                for width, height, blocks in iter_cached_pages(cache_path):
+                    page_text = layout_page_text(
+                        blocks, width, height, self.margin_bottom, self.column_split
+                    )
+                    yielded += 1
+                    yield yielded, self.clean_text(page_text)
+                return
+            except ValueError as e:
+                logger.warning(f"Caché de maquetación dañada para {pdf_path}, se regenera: {e}")
+        
+        import fitz  # PyMuPDF
+        
+        cache_writer = LayoutCacheWriter(cache_path) if cache_path is not None else None
+        try:
+            with fitz.open(str(pdf_path)) as doc:
+                for page_number, page in enumerate(doc, start=1):
+                    blocks = page.get_text("blocks")
+                    if cache_writer is not None:
+                        cache_writer.write_page(page.rect.width, page.rect.height, blocks)
+                    if page_number <= yielded:
+                        continue
+                    page_text = layout_page_text(
+                        blocks, page.rect.width, page.rect.height,
+                        self.margin_bottom, self.column_split
+                    )
+                    yield page_number, self.clean_text(page_text)
+        except BaseException:
+            if cache_writer is not None:
+                cache_writer.abort()
+            raise
+        if cache_writer is not None:
+            cache_writer.commit()
+
+    def _new_metadata(self, pdf_path: Path) -> Dict:
+        """Crea la metadata inicial de extracción de un PDF."""
+        return {
             'filename': pdf_path.name,
             'extraction_date': datetime.now().isoformat(),
             'extraction_method': 'pymupdf_blocks',
@@ -121,79 +206,373 @@ class PDFExtractor:
             'success': False,
             'error': None
         }
-        text = ""
+
+    def _extract_to_stream(
+        self,
+        pdf_path: Path,
+        out: Optional[TextIO],
+        pages: Optional[List[Tuple[int, str]]] = None,
+        sha256: Optional[str] = None
+    ) -> Tuple[Dict, str]:
+        """
+        Escribe el texto de un PDF en un flujo de salida a medida que se extraen las páginas.
+        
+        La memoria usada no depende del tamaño del documento: solo se retiene la página
+        actual y la muestra de texto para la detección de idioma (salvo que se pida
+        la lista de páginas para el almacén columnar).
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            out: Flujo de texto donde escribir el documento (None = no escribir)
+            pages: Lista donde acumular (número de página, texto) de las páginas con texto
+            sha256: Hash del PDF si ya se calculó
+            
+        Returns:
+            Tuple[Dict, str]: Metadata del proceso de extracción y muestra de texto
+            para la detección de idioma (que se hace aparte, en lote)
+        """
+        metadata = self._new_metadata(pdf_path)
+        sample = ""
+        has_text = False
         try:
-            doc = fitz.open(str(pdf_path))
-            metadata['num_pages'] = doc.page_count
-            for page in doc:
-                blocks = page.get_text("blocks")
-                page_height = page.rect.height
-                page_width = page.rect.width
-                margin_bottom = 70
-                clean_blocks = []
-                for block in blocks:
-                    if block[1] < page_height - margin_bottom:
-                        block_text = block[4].strip()
-                        if block_text and not block_text.lower().startswith("<image"):
-                            clean_blocks.append(block)
-                # Separar columnas
-                left_col = [b for b in clean_blocks if b[0] < page_width / 2]
-                right_col = [b for b in clean_blocks if b[0] >= page_width / 2]
-                left_col_sorted = sorted(left_col, key=lambda b: (b[1], b[0]))
-                right_col_sorted = sorted(right_col, key=lambda b: (b[1], b[0]))
-                sorted_blocks = left_col_sorted + right_col_sorted
-                page_text = "\n".join(block[4].strip() for block in sorted_blocks if block[4].strip())
-                text += page_text + "\n"
-            # Limpiar el texto extraído
-            text = self.clean_text(text)
-            # Detectar idioma
-            if text.strip():
-                doc_spacy = self.nlp(text[:1000])
-                metadata['language'] = doc_spacy.lang_
+            for page_number, page_text in self.iter_pages(pdf_path, sha256):
+                metadata['num_pages'] = page_number
+                if not page_text:
+                    continue
+                if pages is not None:
+                    pages.append((page_number, page_text))
+                if out is not None:
+                    if has_text:
+                        out.write("\n")
+                    out.write(page_text)
+                if has_text and len(sample) < LANGUAGE_SAMPLE_SIZE:
+                    sample += "\n"
+                has_text = True
+                if len(sample) < LANGUAGE_SAMPLE_SIZE:
+                    sample += page_text[:LANGUAGE_SAMPLE_SIZE - len(sample)]
+            if has_text:
                 metadata['success'] = True
             else:
                 metadata['error'] = "No se pudo extraer texto del PDF"
         except Exception as e:
+            metadata['success'] = False
             metadata['error'] = str(e)
             logger.error(f"Error procesando {pdf_path}: {str(e)}")
+        return metadata, sample
+
+    def extract_text_from_pdf(self, pdf_path: Path) -> Tuple[str, Dict]:
+        """
+        Extrae el texto de un archivo PDF usando PyMuPDF (fitz) y lógica de bloques para separar columnas y eliminar pies de página.
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            
+        Returns:
+            Tuple[str, Dict]: Texto extraído y metadata del proceso
+        """
+        buffer = io.StringIO()
+        metadata, sample = self._extract_to_stream(pdf_path, buffer)
+        if not metadata['success']:
             return "", metadata
-        return text, metadata
+        metadata['language'] = detect_language(sample)
+        return buffer.getvalue(), metadata
+
+    def process_pdf(self, pdf_path: Path, sha256: Optional[str] = None) -> Dict:
+        """
+        Extrae el texto de un PDF y lo escribe página a página en el directorio de procesados.
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            sha256: Hash del PDF si ya se calculó
+            
+        Returns:
+            Dict: Metadata del proceso de extracción
+        """
+        metadata, sample, _ = self._process_pdf(pdf_path, sha256)
+        if metadata['success']:
+            metadata['language'] = detect_language(sample)
+        return metadata
+
+    def _process_pdf(
+        self,
+        pdf_path: Path,
+        sha256: Optional[str] = None
+    ) -> Tuple[Dict, str, Optional[List[Tuple[int, str]]]]:
+        """
+        Igual que process_pdf, pero sin detectar el idioma.
+        
+        Returns:
+            Tuple: Metadata, muestra de texto para la detección de idioma y, si se
+            usa el almacén columnar, la lista de páginas
+        """
+        pages = [] if self.store is not None else None
+        if not self.write_txt:
+            metadata, sample = self._extract_to_stream(pdf_path, None, pages, sha256)
+            return metadata, sample, pages
+        
+        output_path = self.processed_dir / f"{pdf_path.stem}.txt"
+        tmp_path = output_path.with_suffix('.txt.tmp')
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            metadata, sample = self._extract_to_stream(pdf_path, f, pages, sha256)
+        
+        if metadata['success']:
+            # Reemplazo atómico para no dejar salidas a medio escribir
+            os.replace(tmp_path, output_path)
+            
+            # Agregar rutas a la metadata
+            metadata['input_path'] = str(pdf_path)
+            metadata['output_path'] = str(output_path)
+        else:
+            tmp_path.unlink()
+        
+        return metadata, sample, pages
+
+    def _extract_pdfs(
+        self,
+        pdf_files: List[Path],
+        n_workers: int,
+        store_writer: Optional[ExtractionStoreWriter] = None,
+        hashes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Extrae una lista de PDFs, en serie o con un pool de procesos supervisados, y
+        detecta el idioma de todos ellos en un único lote al final.
+        
+        En modo supervisado, un PDF que agota el tiempo o la memoria, o que hace caer
+        al proceso de trabajo, se registra como fallido con el motivo y el proceso se
+        reemplaza sin detener el resto del lote.
+        
+        Args:
+            pdf_files: PDFs a procesar
+            n_workers: Número de procesos a usar
+            store_writer: Escritor del almacén columnar; las páginas de cada PDF se
+                escriben en cuanto llega su resultado y no se retienen en memoria
+            hashes: Hashes de contenido ya calculados, en el orden de pdf_files
+            
+        Returns:
+            Lista de metadata en el mismo orden que pdf_files
+        """
+        results = []
+        hashes = hashes or [None] * len(pdf_files)
+        
+        def collect(result: Tuple[Dict, str, Optional[List[Tuple[int, str]]]]) -> None:
+            metadata, sample, pages = result
+            if store_writer is not None and metadata['success'] and pages:
+                store_writer.write_document(Path(metadata['filename']).stem, pages)
+            results.append((metadata, sample))
+        
+        supervised = self.task_timeout is not None or self.memory_limit_mb is not None
+        if pdf_files and (supervised or (n_workers > 1 and len(pdf_files) > 1)):
+            n_workers = min(n_workers, len(pdf_files))
+            logger.info(f"Extrayendo {len(pdf_files)} PDFs con {n_workers} procesos supervisados")
+            with SupervisedPool(
+                _process_pdf_in_worker,
+                n_workers,
+                initializer=_init_worker,
+                initargs=(self._worker_kwargs(),),
+                task_timeout=self.task_timeout,
+                memory_limit_mb=self.memory_limit_mb
+            ) as pool:
+                # imap conserva el orden de entrada
+                for pdf_path, result in tqdm(
+                    zip(pdf_files, pool.imap(zip(pdf_files, hashes))),
+                    total=len(pdf_files),
+                    desc="Procesando PDFs"
+                ):
+                    if isinstance(result, TaskFailure):
+                        result = self._failed_result(pdf_path, result.reason)
+                    collect(result)
+                if pool.restarts:
+                    logger.warning(f"Procesos de extracción reemplazados: {pool.restarts}")
+        else:
+            for pdf_path, sha256 in tqdm(zip(pdf_files, hashes), total=len(pdf_files), desc="Procesando PDFs"):
+                collect(self._process_pdf(pdf_path, sha256))
+        
+        # Detección de idioma en lote sobre las muestras de los documentos extraídos
+        extracted = [(metadata, sample) for metadata, sample in results if metadata['success']]
+        languages = detect_languages(sample for _, sample in extracted)
+        for (metadata, _), language in zip(extracted, languages):
+            metadata['language'] = language
+        
+        return [metadata for metadata, _ in results]
+
+    def _failed_result(self, pdf_path: Path, reason: str) -> Tuple[Dict, str, None]:
+        """
+        Construye el resultado de un PDF cuyo proceso de extracción no terminó.
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            reason: Motivo del fallo (timeout, memoria, caída del proceso...)
+            
+        Returns:
+            Tuple: Metadata con el error, muestra vacía y sin páginas
+        """
+        logger.error(f"Error procesando {pdf_path}: {reason}")
+        # El proceso pudo morir a mitad de escritura
+        tmp_path = self.processed_dir / f"{pdf_path.stem}.txt.tmp"
+        if tmp_path.exists():
+            tmp_path.unlink()
+        metadata = self._new_metadata(pdf_path)
+        metadata['error'] = reason
+        return metadata, "", None
+
+    def _has_outputs(self, metadata: Dict, store_writer: Optional[ExtractionStoreWriter]) -> bool:
+        """Comprueba que las salidas de una extracción previa siguen disponibles."""
+        if self.write_txt:
+            output_path = metadata.get('output_path')
+            if not output_path or not Path(output_path).exists():
+                return False
+        if store_writer is not None:
+            return store_writer.has_previous(Path(metadata['filename']).stem)
+        return True
+
+    def _remove_output(self, entry: Dict) -> None:
+        """Elimina el texto procesado asociado a una entrada del manifiesto."""
+        output_path = entry.get('metadata', {}).get('output_path')
+        if output_path and Path(output_path).exists():
+            Path(output_path).unlink()
 
-    def process_all_pdfs(self) -> pd.DataFrame:
+    def process_all_pdfs(
+        self,
+        n_workers: Optional[int] = None,
+        incremental: bool = True
+    ) -> 'pd.DataFrame':
         """
         Procesa todos los PDFs en el directorio raw y guarda los textos extraídos.
         
+        En modo incremental solo se extraen los PDFs nuevos o modificados según el
+        manifiesto (hash, tamaño, mtime y versión del extractor), se eliminan las
+        salidas de PDFs borrados y se omiten los duplicados byte a byte.
+        
+        Args:
+            n_workers: Número de procesos a usar (por defecto, el del extractor)
+            incremental: Si reutilizar las extracciones registradas en el manifiesto
+        
         Returns:
             pd.DataFrame: DataFrame con la metadata de todos los documentos procesados
         """
-        all_metadata = []
-        pdf_files = list(self.raw_dir.glob('*.pdf'))
+        import pandas as pd
+        
+        n_workers = n_workers or self.n_workers
+        # Orden determinista para que el CSV no dependa del sistema de archivos
+        pdf_files = sorted(self.raw_dir.glob('*.pdf'))
+        
+        previous = load_manifest(self.manifest_path).get('documents', {}) if incremental else {}
+        entries: Dict[str, Dict] = {}
+        seen_hashes: Dict[str, str] = {}
+        to_extract: List[Path] = []
+        unchanged = duplicates = 0
+        # Los documentos sin cambios se copian del almacén columnar anterior
+        store_writer = self.store.open_writer() if self.store is not None and pdf_files else None
+        
+        for pdf_path in pdf_files:
+            stat = pdf_path.stat()
+            old = previous.get(pdf_path.name)
+            same_version = (
+                bool(old)
+                and old.get('extractor_version') == self.EXTRACTOR_VERSION
+                and old.get('layout_params') == self._layout_params()
+            )
+            
+            # Si tamaño y mtime no cambian, se confía en el hash registrado
+            if same_version and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime:
+                sha256 = old['sha256']
+            else:
+                sha256 = file_sha256(pdf_path)
+            
+            entry = {
+                'sha256': sha256,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'extractor_version': self.EXTRACTOR_VERSION,
+                'layout_params': self._layout_params()
+            }
+            entries[pdf_path.name] = entry
+            
+            if sha256 in seen_hashes:
+                # Duplicado exacto de otro PDF del corpus: no se extrae
+                duplicates += 1
+                entry['duplicate_of'] = seen_hashes[sha256]
+                entry['metadata'] = {
+                    'filename': pdf_path.name,
+                    'success': False,
+                    'error': None,
+                    'duplicate_of': seen_hashes[sha256]
+                }
+                if old:
+                    self._remove_output(old)
+                continue
+            seen_hashes[sha256] = pdf_path.name
+            
+            old_metadata = old.get('metadata', {}) if old else {}
+            if (same_version and old['sha256'] == sha256 and old_metadata.get('success')
+                    and self._has_outputs(old_metadata, store_writer)):
+                unchanged += 1
+                entry['metadata'] = old_metadata
+                if store_writer is not None:
+                    store_writer.copy_document(pdf_path.stem)
+            else:
+                to_extract.append(pdf_path)
+        
+        # Eliminar salidas de PDFs que ya no existen en el directorio raw
+        removed = [name for name in previous if name not in entries]
+        for name in removed:
+            self._remove_output(previous[name])
+        
+        # Eliminar la geometría en caché de versiones que ya no usa ningún PDF del
+        # corpus (PDFs borrados o cuyo contenido ha cambiado)
+        if self.layout_cache_dir is not None:
+            stale_hashes = {entry.get('sha256') for entry in previous.values()} - set(seen_hashes)
+            for cache_sha in stale_hashes:
+                if not cache_sha:
+                    continue
+                cache_path = self._layout_cache_path(cache_sha)
+                if cache_path.exists():
+                    cache_path.unlink()
+        
+        # Con salida solo txt (o sin PDFs) un almacén columnar anterior quedaría
+        # desactualizado y los lectores lo preferirían a los .txt
+        if self.store is None or not pdf_files:
+            stale_store = self.store or ExtractionStore(self.processed_dir / 'corpus')
+            if stale_store.remove():
+                logger.info(f"Almacén columnar anterior eliminado: {stale_store.path}")
         
         if not pdf_files:
             logger.warning(f"No se encontraron archivos PDF en {self.raw_dir}")
+            if incremental:
+                save_manifest({'documents': {}}, self.manifest_path)
             return pd.DataFrame()
         
-        for pdf_path in tqdm(pdf_files, desc="Procesando PDFs"):
-            text, metadata = self.extract_text_from_pdf(pdf_path)
-            
-            if text:
-                # Guardar el texto extraído
-                output_path = self.processed_dir / f"{pdf_path.stem}.txt"
-                output_path.write_text(text, encoding='utf-8')
-                
-                # Agregar rutas a la metadata
-                metadata['input_path'] = str(pdf_path)
-                metadata['output_path'] = str(output_path)
-            
-            all_metadata.append(metadata)
+        logger.info(
+            f"PDFs a extraer: {len(to_extract)}, sin cambios: {unchanged}, "
+            f"duplicados: {duplicates}, eliminados: {len(removed)}"
+        )
+        
+        try:
+            extracted = self._extract_pdfs(
+                to_extract, n_workers, store_writer,
+                [entries[pdf_path.name]['sha256'] for pdf_path in to_extract]
+            )
+        except BaseException:
+            if store_writer is not None:
+                store_writer.abort()
+            raise
+        for pdf_path, metadata in zip(to_extract, extracted):
+            entries[pdf_path.name]['metadata'] = metadata
+        
+        if store_writer is not None:
+            store_writer.close([entries[pdf_path.name]['metadata'] for pdf_path in pdf_files])
+            logger.info(f"Almacén columnar actualizado: {self.store.path}")
+        
+        save_manifest({'documents': entries}, self.manifest_path)
         
         # Crear DataFrame con la metadata
-        df_metadata = pd.DataFrame(all_metadata)
+        df_metadata = pd.DataFrame([entries[pdf_path.name]['metadata'] for pdf_path in pdf_files])
         
         # Guardar metadata en CSV
-        metadata_dir = Path('data/metadata')
-        metadata_dir.mkdir(parents=True, exist_ok=True)
-        df_metadata.to_csv(metadata_dir / 'pdf_extraction_metadata.csv', index=False)
+        self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        df_metadata.to_csv(self.metadata_dir / 'pdf_extraction_metadata.csv', index=False)
         
         # Resumen del proceso
         successful = df_metadata['success'].sum()
@@ -204,16 +583,45 @@ class PDFExtractor:
 
 def main():
     """Función principal para ejecutar la extracción de texto"""
+    parser = argparse.ArgumentParser(description="Extrae el texto de los PDFs de seguros")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de procesos de extracción (0 = todos los núcleos)")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignora el manifiesto y re-extrae todos los PDFs")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="Tiempo máximo en segundos por PDF")
+    parser.add_argument('--max-memory-mb', type=int, default=None,
+                        help="Memoria máxima por proceso de extracción en MB")
+    parser.add_argument('--output-format', choices=PDFExtractor.OUTPUT_FORMATS, default='txt',
+                        help="Formato de salida: .txt por PDF, almacén Parquet o ambos")
+    parser.add_argument('--margin-bottom', type=float, default=70,
+                        help="Altura del pie de página a descartar (puntos)")
+    parser.add_argument('--column-split', type=float, default=0.5,
+                        help="División entre columnas como fracción del ancho de página")
+    parser.add_argument('--no-layout-cache', action='store_true',
+                        help="No usar la caché de geometría de bloques")
+    args = parser.parse_args()
+    
     try:
-        extractor = PDFExtractor()
-        metadata_df = extractor.process_all_pdfs()
+        extractor = PDFExtractor(
+            n_workers=args.workers,
+            task_timeout=args.timeout,
+            memory_limit_mb=args.max_memory_mb,
+            output_format=args.output_format,
+            margin_bottom=args.margin_bottom,
+            column_split=args.column_split,
+            layout_cache_dir=None if args.no_layout_cache else 'data/cache/layout'
+        )
+        metadata_df = extractor.process_all_pdfs(incremental=not args.full)
         
         if not metadata_df.empty:
             # Mostrar resumen
             print("\nResumen de la extracción:")
             print(f"Total de documentos procesados: {len(metadata_df)}")
+            duplicates = metadata_df['duplicate_of'].notna().sum() if 'duplicate_of' in metadata_df else 0
             print(f"Documentos exitosos: {metadata_df['success'].sum()}")
-            print(f"Documentos con errores: {len(metadata_df) - metadata_df['success'].sum()}")
+            print(f"Documentos duplicados omitidos: {duplicates}")
+            print(f"Documentos con errores: {len(metadata_df) - metadata_df['success'].sum() - duplicates}")
             print("\nMétodos de extracción utilizados:")
             print(metadata_df['extraction_method'].value_counts())
             print("\nIdiomas detectados:")
@@ -0,0 +1,263 @@
+"""
+Almacén columnar (Parquet) del texto extraído de los PDFs.
+
+El almacén es un directorio con dos tablas:
+
+- ``pages.parquet``: una fila por página (doc_id, page_number, text), con un
+  row group por documento para poder leer un documento sin tocar el resto.
+- ``documents.parquet``: una fila por documento con la metadata de extracción
+  y el row group de sus páginas.
+
+Ambos archivos se pueden abrir con memory-map y leer solo las columnas necesarias.
+Cada escritura guarda el mismo identificador en los metadatos de los dos archivos
+y publica documents.parquet en último lugar; un almacén cuyos identificadores no
+coinciden (escritura interrumpida entre los dos reemplazos) se considera ausente.
+Requiere ``pyarrow`` (dependencia opcional).
+"""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+def _import_pyarrow():
+    """Importa pyarrow bajo demanda con un mensaje claro si no está instalado."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "El almacén columnar requiere pyarrow. Instálalo con: pip install pyarrow"
+        ) from e
+    return pa, pq
+
+class ExtractionStore:
+    """
+    Lector del almacén columnar de texto extraído.
+    """
+
+    PAGES_FILE = 'pages.parquet'
+    DOCUMENTS_FILE = 'documents.parquet'
+
+    # Clave de los metadatos Parquet con el identificador de la escritura
+    STORE_ID_KEY = b'store_id'
+
+    # Columnas de metadata de extracción que se guardan por documento
+    DOCUMENT_FIELDS = [
+        'filename', 'num_pages', 'language', 'extraction_date', 'extraction_method'
+    ]
+
+    def __init__(self, path: str = 'data/processed/corpus'):
+        """
+        Args:
+            path: Directorio del almacén
+        """
+        self.path = Path(path)
+        self.pages_path = self.path / self.PAGES_FILE
+        self.documents_path = self.path / self.DOCUMENTS_FILE
+        self._row_groups: Optional[Dict[str, int]] = None
+
+    def exists(self) -> bool:
+        """Indica si el almacén está completo y ambas tablas son de la misma escritura."""
+        if not (self.pages_path.exists() and self.documents_path.exists()):
+            return False
+        _, pq = _import_pyarrow()
+        # Solo se leen los pies de página de los archivos
+        return self._store_id(pq, self.pages_path) == self._store_id(pq, self.documents_path)
+
+    def _store_id(self, pq, path: Path) -> Optional[bytes]:
+        """Lee el identificador de escritura de los metadatos de un archivo."""
+        metadata = pq.read_schema(path).metadata or {}
+        return metadata.get(self.STORE_ID_KEY)
+
+    def remove(self) -> bool:
+        """
+        Elimina el almacén del disco.
+
+        Returns:
+            bool: True si había un almacén que eliminar
+        """
+        self._row_groups = None
+        if not self.path.exists():
+            return False
+        shutil.rmtree(self.path)
+        return True
+
+    def read_documents(self, columns: Optional[Sequence[str]] = None):
+        """
+        Lee la tabla de documentos.
+
+        Args:
+            columns: Columnas a leer (None = todas)
+
+        Returns:
+            pyarrow.Table con una fila por documento
+        """
+        _, pq = _import_pyarrow()
+        return pq.read_table(self.documents_path, columns=columns, memory_map=True)
+
+    def row_groups(self) -> Dict[str, int]:
+        """
+        Devuelve el índice doc_id -> row group de la tabla de páginas.
+
+        Returns:
+            Diccionario con el row group de cada documento
+        """
+        if self._row_groups is None:
+            table = self.read_documents(columns=['doc_id', 'row_group'])
+            self._row_groups = dict(zip(
+                table.column('doc_id').to_pylist(),
+                table.column('row_group').to_pylist()
+            ))
+        return self._row_groups
+
+    def read_pages(self, doc_id: str, columns: Sequence[str] = ('page_number', 'text')):
+        """
+        Lee las páginas de un documento sin leer el resto del almacén.
+
+        Args:
+            doc_id: Identificador del documento (nombre del PDF sin extensión)
+            columns: Columnas de la tabla de páginas a leer
+
+        Returns:
+            pyarrow.Table con las páginas del documento
+        """
+        _, pq = _import_pyarrow()
+        row_group = self.row_groups()[doc_id]
+        return pq.ParquetFile(self.pages_path, memory_map=True).read_row_group(
+            row_group, columns=list(columns)
+        )
+
+    def iter_texts(self) -> Iterator[Tuple[str, str]]:
+        """
+        Recorre los documentos del almacén devolviendo su texto completo.
+
+        Yields:
+            Tuple[str, str]: doc_id y texto del documento (páginas unidas por salto de línea)
+        """
+        _, pq = _import_pyarrow()
+        pages_file = pq.ParquetFile(self.pages_path, memory_map=True)
+        for doc_id, row_group in self.row_groups().items():
+            texts = pages_file.read_row_group(row_group, columns=['text']).column('text')
+            yield doc_id, '\n'.join(texts.to_pylist())
+
+    def open_writer(self) -> 'ExtractionStoreWriter':
+        """Abre un escritor que reemplaza el almacén de forma atómica al cerrarse."""
+        return ExtractionStoreWriter(self)
+
+class ExtractionStoreWriter:
+    """
+    Escritor incremental del almacén: un row group por documento.
+
+    Escribe en archivos temporales y los mueve sobre los definitivos en close(),
+    por lo que los lectores nunca ven un almacén a medio escribir. Los documentos
+    sin cambios se copian row group a row group desde el almacén anterior.
+    """
+
+    def __init__(self, store: ExtractionStore):
+        """
+        Args:
+            store: Almacén de destino
+        """
+        self.pa, self.pq = _import_pyarrow()
+        self.store = store
+        self.store.path.mkdir(parents=True, exist_ok=True)
+        self._metadata = {ExtractionStore.STORE_ID_KEY: uuid.uuid4().hex.encode()}
+
+        self.schema = self.pa.schema([
+            ('doc_id', self.pa.string()),
+            ('page_number', self.pa.int32()),
+            ('text', self.pa.string()),
+        ], metadata=self._metadata)
+        self._tmp_pages = store.pages_path.with_suffix('.parquet.tmp')
+        self._writer = self.pq.ParquetWriter(self._tmp_pages, self.schema, compression='zstd')
+        self._row_groups: Dict[str, int] = {}
+
+        # Almacén anterior para copiar documentos sin cambios
+        self._previous = None
+        self._previous_row_groups: Dict[str, int] = {}
+        if store.exists():
+            self._previous = self.pq.ParquetFile(store.pages_path, memory_map=True)
+            self._previous_row_groups = store.row_groups()
+
+    def has_previous(self, doc_id: str) -> bool:
+        """Indica si el documento está en el almacén anterior."""
+        return doc_id in self._previous_row_groups
+
+    def write_document(self, doc_id: str, pages: List[Tuple[int, str]]) -> None:
+        """
+        Añade las páginas de un documento como un row group nuevo.
+
+        Args:
+            doc_id: Identificador del documento
+            pages: Lista de (número de página, texto limpio)
+        """
+        table = self.pa.table({
+            'doc_id': [doc_id] * len(pages),
+            'page_number': [number for number, _ in pages],
+            'text': [text for _, text in pages],
+        }, schema=self.schema)
+        self._write(doc_id, table)
+
+    def copy_document(self, doc_id: str) -> bool:
+        """
+        Copia un documento sin cambios desde el almacén anterior.
+
+        Returns:
+            bool: False si el documento no estaba en el almacén anterior
+        """
+        if doc_id not in self._previous_row_groups:
+            return False
+        self._write(doc_id, self._previous.read_row_group(self._previous_row_groups[doc_id]))
+        return True
+
+    def _write(self, doc_id: str, table) -> None:
+        """Escribe una tabla como un único row group."""
+        self._row_groups[doc_id] = len(self._row_groups)
+        self._writer.write_table(table, row_group_size=max(1, table.num_rows))
+
+    def close(self, documents: List[Dict]) -> None:
+        """
+        Escribe la tabla de documentos y publica el almacén.
+
+        Args:
+            documents: Metadata de extracción de los documentos; solo se incluyen
+                los que tienen páginas en el almacén
+        """
+        self._writer.close()
+        rows = []
+        for metadata in documents:
+            doc_id = Path(metadata['filename']).stem
+            if doc_id not in self._row_groups:
+                continue
+            row = {field: metadata.get(field) for field in ExtractionStore.DOCUMENT_FIELDS}
+            row['doc_id'] = doc_id
+            row['row_group'] = self._row_groups[doc_id]
+            rows.append(row)
+
+        documents_table = self.pa.Table.from_pylist(rows, schema=self.pa.schema([
+            ('doc_id', self.pa.string()),
+            ('row_group', self.pa.int32()),
+            ('filename', self.pa.string()),
+            ('num_pages', self.pa.int32()),
+            ('language', self.pa.string()),
+            ('extraction_date', self.pa.string()),
+            ('extraction_method', self.pa.string()),
+        ], metadata=self._metadata))
+        tmp_documents = self.store.documents_path.with_suffix('.parquet.tmp')
+        self.pq.write_table(documents_table, tmp_documents)
+
+        # Liberar el memory-map del almacén anterior antes de reemplazarlo. La
+        # tabla de documentos va la última: hasta su reemplazo los identificadores
+        # no coinciden y exists() no da por válido el almacén
+        self._previous = None
+        os.replace(self._tmp_pages, self.store.pages_path)
+        os.replace(tmp_documents, self.store.documents_path)
+        self.store._row_groups = None
+
+    def abort(self) -> None:
+        """Descarta lo escrito sin modificar el almacén existente."""
+        self._writer.close()
+        if self._tmp_pages.exists():
+            self._tmp_pages.unlink()
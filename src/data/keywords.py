@@ -0,0 +1,46 @@
+"""
+Palabras clave por documento ponderadas con TF-IDF sobre todo el corpus.
+
+En lugar de guardar todos los lemas de contenido de cada documento, se puntúan
+con TF-IDF (los términos que aparecen en todos los IPID, como "seguro" o
+"póliza", pesan poco) y se conservan solo los N mejores de cada documento.
+"""
+
+from typing import List, Optional, Sequence
+
+def corpus_keywords(
+    documents: Sequence[Sequence[str]],
+    top_n: Optional[int] = 10
+) -> List[List[str]]:
+    """
+    Selecciona las palabras clave más discriminativas de cada documento.
+
+    Args:
+        documents: Lemas de cada documento, con repeticiones (p. ej. los de
+            DocumentAnalysis filtrados a sus palabras clave candidatas)
+        top_n: Palabras clave por documento (None = todas, ordenadas por peso)
+
+    Returns:
+        Lista de palabras clave de cada documento, de mayor a menor peso
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if not any(documents):
+        return [[] for _ in documents]
+
+    # Los documentos ya vienen tokenizados y lematizados por spaCy
+    vectorizer = TfidfVectorizer(analyzer=lambda lemmas: lemmas, sublinear_tf=True)
+    matrix = vectorizer.fit_transform(documents).tocsr()
+    terms = vectorizer.get_feature_names_out()
+
+    keywords = []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        indices = matrix.indices[start:end]
+        scores = matrix.data[start:end]
+        # Mayor peso primero; a igualdad de peso, orden alfabético para ser deterministas
+        ranked = sorted(zip(-scores, terms[indices]))
+        if top_n is not None:
+            ranked = ranked[:top_n]
+        keywords.append([str(term) for _, term in ranked])
+    return keywords
@@ -0,0 +1,68 @@
+"""
+Detección de idioma ligera para los textos extraídos.
+
+Usa los perfiles de n-gramas de caracteres de langdetect, que se cargan una sola
+vez por proceso, en lugar de ejecutar un pipeline completo de spaCy por documento.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+# Semilla fija: langdetect es probabilístico y queremos resultados reproducibles
+DetectorFactory.seed = 0
+
+@lru_cache(maxsize=None)
+def _get_factory() -> DetectorFactory:
+    """Carga los perfiles de idioma una sola vez por proceso."""
+    factory = DetectorFactory()
+    factory.load_profile(PROFILES_DIRECTORY)
+    return factory
+
+def _detect(factory: DetectorFactory, text: str) -> Optional[str]:
+    """Detecta el idioma de un texto con un detector nuevo de la factoría."""
+    if not text or not text.strip():
+        return None
+    try:
+        detector = factory.create()
+        detector.append(text)
+        return detector.detect()
+    except LangDetectException:
+        return None
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Detecta el idioma de un texto.
+
+    Args:
+        text: Texto (basta con una muestra de unos cientos de caracteres)
+
+    Returns:
+        Código ISO 639-1 del idioma (p. ej. 'es') o None si no se puede determinar
+    """
+    return _detect(_get_factory(), text)
+
+def detect_languages(texts: Iterable[str]) -> List[Optional[str]]:
+    """
+    Detecta el idioma de un lote de textos.
+
+    La factoría con los perfiles se obtiene una vez para todo el lote y las
+    muestras repetidas (p. ej. documentos que empiezan con el mismo texto legal)
+    se analizan una sola vez.
+
+    Args:
+        texts: Textos o muestras de texto
+
+    Returns:
+        Lista de códigos de idioma en el mismo orden que los textos
+    """
+    factory = _get_factory()
+    detected: Dict[str, Optional[str]] = {}
+    languages = []
+    for text in texts:
+        if text not in detected:
+            detected[text] = _detect(factory, text)
+        languages.append(detected[text])
+    return languages
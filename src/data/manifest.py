@@ -0,0 +1,72 @@
+"""
+Utilidades para los manifiestos de procesamiento incremental.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Union
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo por bloques.
+
+    Args:
+        path: Ruta al archivo
+        chunk_size: Tamaño de los bloques de lectura en bytes
+
+    Returns:
+        Hash hexadecimal del contenido
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def text_sha256(text: str) -> str:
+    """
+    Calcula el hash SHA-256 de un texto codificado en UTF-8.
+
+    Args:
+        text: Texto a resumir
+
+    Returns:
+        Hash hexadecimal del texto
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def load_manifest(path: Union[str, Path]) -> Dict:
+    """
+    Carga un manifiesto JSON; devuelve un diccionario vacío si no existe o está dañado.
+
+    Args:
+        path: Ruta al manifiesto
+
+    Returns:
+        Contenido del manifiesto
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest: Dict, path: Union[str, Path]) -> None:
+    """
+    Guarda un manifiesto de forma atómica (escritura en temporal + reemplazo).
+
+    Args:
+        manifest: Contenido del manifiesto
+        path: Ruta destino
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -1,15 +1,30 @@
 import os
 import re
+import argparse
 import json
 import logging
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional, Tuple
 
-import pandas as pd
-import spacy
 from tqdm import tqdm
 
+from src.data.catalog import DocumentCatalog
+from src.data.document_analysis import AnalysisCache, DocumentAnalysis
+from src.data.entity_validator import (
+    ENTITY_PATTERNS, KNOWN_LOCATIONS, KNOWN_ORGANIZATIONS, STOP_ENTITIES, EntityValidator
+)
+from src.data.extraction_store import ExtractionStore
+from src.data.keywords import corpus_keywords
+from src.data.manifest import load_manifest, save_manifest, text_sha256
+from src.data.sections import DEFAULT_SCANNER, SECTION_PATTERNS
+from src.data.worker_pool import SupervisedPool, TaskFailure
+
+# spaCy y pandas se importan al usarse para que importar el módulo sea barato
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Configuración del logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +36,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Generador propio de cada proceso de trabajo (spaCy se carga una sola vez por worker)
+_worker_generator: Optional['MetadataGenerator'] = None
+
+def _init_worker(generator_kwargs: Dict) -> None:
+    """Crea el generador una única vez en el proceso de trabajo."""
+    global _worker_generator
+    _worker_generator = MetadataGenerator(**generator_kwargs)
+
+def _generate_shard_in_worker(shard: List[Tuple[Path, str, str]]) -> List[Tuple[str, Dict, List[str]]]:
+    """Genera los metadatos de un grupo de documentos con el generador del proceso."""
+    return _worker_generator._generate_shard(shard)
+
 class MetadataGenerator:
     # Campos requeridos según el esquema
     REQUIRED_FIELDS = [
@@ -42,17 +69,56 @@ class MetadataGenerator:
         'language'
     ]
     
-    def __init__(self, processed_dir: str = 'data/processed', metadata_dir: str = 'data/metadata'):
+    # Componentes de spaCy que el análisis no necesita: entidades, lemas y
+    # palabras clave salen de ner, morphologizer y lemmatizer en un único parse
+    ANALYSIS_DISABLED_PIPES = ('parser', 'senter')
+    
+    # Documentos que se leen a la vez antes de pasarlos por nlp.pipe
+    DOCUMENT_WINDOW = 256
+    
+    # Documentos por tarea en el modo con procesos de trabajo
+    WORKER_SHARD_SIZE = 16
+    
+    # Versión del generador; cambiarla fuerza la regeneración en modo incremental
+    GENERATOR_VERSION = "2"
+    
+    def __init__(
+        self,
+        processed_dir: str = 'data/processed',
+        metadata_dir: str = 'data/metadata',
+        batch_size: int = 32,
+        n_process: int = 1,
+        analysis_cache_dir: Optional[str] = 'data/cache/analysis',
+        top_keywords: Optional[int] = 10,
+        n_workers: int = 1
+    ):
         """
         Inicializa el generador de metadatos.
         
         Args:
             processed_dir: Directorio con los textos procesados
             metadata_dir: Directorio donde se guardarán los metadatos
+            batch_size: Documentos por lote en nlp.pipe
+            n_process: Procesos de spaCy para nlp.pipe (-1 = todos los núcleos)
+            analysis_cache_dir: Directorio de la caché de análisis por hash de contenido
+                (None = sin caché)
+            top_keywords: Palabras clave TF-IDF por documento en el catálogo (None = todas)
+            n_workers: Procesos de trabajo que generan metadatos en paralelo
+                (1 = en el proceso principal, 0 = todos los núcleos); cada uno
+                carga spaCy una vez y usa n_process=1
         """
         self.processed_dir = Path(processed_dir)
         self.metadata_dir = Path(metadata_dir)
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.top_keywords = top_keywords
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.analysis_cache_dir = analysis_cache_dir
+        self.manifest_path = self.metadata_dir / 'metadata_manifest.json'
+        self.catalog = DocumentCatalog(self.metadata_dir / 'catalog.sqlite')
+        
+        import spacy
         
         # Cargar modelo de spaCy
         try:
@@ -60,6 +126,14 @@ class MetadataGenerator:
         except OSError:
             logger.error("No se pudo cargar el modelo de spaCy")
             raise
+        self.analysis_disabled = [
+            name for name in self.ANALYSIS_DISABLED_PIPES if name in self.nlp.pipe_names
+        ]
+        model_name = f"{self.nlp.meta.get('name', '')}-{self.nlp.meta.get('version', '')}"
+        self.analysis_cache = (
+            AnalysisCache(analysis_cache_dir, model_name, self.analysis_disabled)
+            if analysis_cache_dir else None
+        )
         
         # Patrones para identificar información según el esquema
         self.patterns = {
@@ -69,60 +143,19 @@ class MetadataGenerator:
         }
         
         # Secciones específicas para chunking según las instrucciones
-        self.sections = {
-            'consiste': r'(?i)en\s+qué\s+consiste\s+este\s+tipo\s+de\s+seguro',
-            'asegurado': r'(?i)qué\s+se\s+asegura',
-            'no_asegurado': r'(?i)qué\s+no\s+está\s+asegurado',
-            'sumas': r'(?i)sumas\s+aseguradas',
-            'restricciones': r'(?i)existen\s+restricciones\s+en\s+lo\s+que\s+respecta\s+a\s+la\s+cobertura',
-            'cobertura': r'(?i)dónde\s+estoy\s+cubierto',
-            'obligaciones': r'(?i)cuáles\s+son\s+mis\s+obligaciones',
-            'pagos': r'(?i)cuándo\s+y\s+cómo\s+tengo\s+que\s+efectuar\s+los\s+pagos',
-            'vigencia': r'(?i)cuándo\s+comienza\s+y\s+finaliza\s+la\s+cobertura',
-            'rescindir': r'(?i)cómo\s+puedo\s+rescindir\s+el\s+contrato'
-        }
-        
-        # Palabras comunes que no deben ser consideradas como entidades
-        self.stop_entities = {
-            'ORG': {'además', 'subsidio', 'seguro', 'póliza', 'contrato', 'documento', 'cláusula', 
-                   'condición', 'artículo', 'sección', 'apartado', 'inciso', 'literal', 'documento',
-                   'comunicar', 'anticipación', 'convenio', 'complementario', 'inter-bureaux',
-                   'espacio', 'económico', 'europeo', 'entidad', 'sanitarios', 'daños', 'intereses',
-                   'carta', 'verde', 'civil', 'obligatoria', 'compañía', 'complementaria',
-                   'condiciones', 'particulares', 'cristales', 'fondos', 'pensiones', 'física',
-                   'permanente', 'indemnización', 'lunas', 'nacionales', 'naturaleza', 'reaseguros',
-                   'reclamación', 'tomador', 'circulación', 'conducción', 'asegurado', 'incendio',
-                   'responsabilidad', 'red', 'asesoramiento', 'convenio complementario'},
-            'PER': {'asegurado', 'beneficiario', 'tomador', 'perjudicado', 'tercero', 'usuario',
-                   'convenio', 'complementario', 'sanitarios', 'intereses', 'convenio complementario'},
-            'LOC': {'domicilio', 'residencia', 'dirección', 'localidad', 'municipio', 'provincia',
-                   'ciudad', 'vaticano', 'españa', 'gibraltar', 'mónaco', 'san marino',
-                   'aseguradora', 'carta', 'verde', 'civil', 'obligatoria', 'complementaria',
-                   'comunicar', 'condiciones', 'particulares', 'cristales', 'lunas', 'nacionales',
-                   'naturaleza', 'reaseguros', 'tomador', 'incendio'}
-        }
-        
-        # Patrones para validar entidades
-        self.entity_patterns = {
-            'ORG': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',  # Palabras con inicial mayúscula
-            'PER': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',  # Nombres propios
-            'LOC': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$'   # Nombres de lugares
-        }
-        
-        # Lista de organizaciones conocidas
-        self.known_organizations = {
-            'Mapfre', 'AXA', 'Allianz', 'Generali', 'Zurich', 'Liberty', 'Reale', 
-            'Helvetia', 'Pelayo', 'Mutua Madrileña'
-        }
-        
-        # Lista de ubicaciones conocidas
-        self.known_locations = {
-            'Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Zaragoza', 'Málaga',
-            'Murcia', 'Palma', 'Las Palmas', 'Bilbao', 'Alicante', 'Córdoba',
-            'Valladolid', 'Vigo', 'Gijón', 'Hospitalet', 'Vitoria', 'Elche',
-            'Granada', 'Terrassa', 'A Coruña', 'Cartagena', 'Sabadell', 'Santa Cruz',
-            'Oviedo', 'Móstoles', 'Pamplona', 'Santander', 'Castellón', 'Almería'
-        }
+        self.sections = SECTION_PATTERNS
+        self.section_scanner = DEFAULT_SCANNER
+        
+        # Tablas de validación de entidades (palabras a ignorar, patrones y
+        # listas de organizaciones y ubicaciones conocidas)
+        self.stop_entities = STOP_ENTITIES
+        self.entity_patterns = ENTITY_PATTERNS
+        self.known_organizations = KNOWN_ORGANIZATIONS
+        self.known_locations = KNOWN_LOCATIONS
+        self.entity_validator = EntityValidator(
+            self.stop_entities, self.entity_patterns,
+            self.known_organizations, self.known_locations
+        )
 
     def is_valid_entity(self, entity: str, entity_type: str) -> bool:
         """
@@ -135,88 +168,79 @@ class MetadataGenerator:
         Returns:
             bool: True si la entidad es válida
         """
-        # Convertir a minúsculas para comparación
-        entity_lower = entity.lower()
+        return self.entity_validator.is_valid(entity, entity_type)
+
+    def analyze(self, text: str) -> DocumentAnalysis:
+        """
+        Analiza un documento con un único parse de spaCy (o lo recupera de la caché).
+        
+        Args:
+            text: Texto del documento
+            
+        Returns:
+            DocumentAnalysis con entidades, lemas, palabras clave y recuentos
+        """
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(
+        self,
+        texts: List[str],
+        hashes: Optional[List[str]] = None
+    ) -> List[DocumentAnalysis]:
+        """
+        Analiza un lote de documentos con nlp.pipe; solo se procesan los que no
+        están en la caché.
         
-        # Verificar si está en la lista de palabras a ignorar
-        if entity_lower in self.stop_entities.get(entity_type, set()):
-            return False
+        Args:
+            texts: Textos de los documentos
+            hashes: SHA-256 de los textos si ya se calcularon
             
-        # Verificar si es una combinación de palabras a ignorar
-        words = entity_lower.split()
-        if len(words) > 1:
-            if all(word in self.stop_entities.get(entity_type, set()) for word in words):
-                return False
-        
-        # Verificar longitud mínima
-        if len(entity) < 3:
-            return False
-        
-        # Verificar si es solo un número
-        if entity.isdigit():
-            return False
-        
-        # Verificar si es una palabra común en mayúsculas
-        if entity.isupper() and len(entity) < 5:
-            return False
-        
-        # Verificar si es una palabra con solo la primera letra en mayúscula
-        if entity[0].isupper() and entity[1:].islower() and len(entity) < 5:
-            return False
-        
-        # Verificar si contiene caracteres especiales
-        if re.search(r'[^\w\s]', entity):
-            return False
-        
-        # Verificar si coincide con el patrón esperado para el tipo de entidad
-        if entity_type in self.entity_patterns:
-            if not re.match(self.entity_patterns[entity_type], entity):
-                return False
-        
-        # Verificaciones específicas por tipo de entidad
-        if entity_type == 'ORG':
-            # Para organizaciones, solo aceptar si es una organización conocida
-            return entity in self.known_organizations
-        
-        elif entity_type == 'LOC':
-            # Para ubicaciones, solo aceptar si es una ubicación conocida
-            return entity in self.known_locations
-        
-        elif entity_type == 'PER':
-            # Para personas, verificar que no sea una palabra común o combinación de ellas
-            common_words = {'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'de', 'del',
-                          'convenio', 'complementario', 'sanitarios', 'intereses'}
-            words = entity_lower.split()
-            return not any(word in common_words for word in words)
-        
-        return True
+        Returns:
+            Lista de DocumentAnalysis en el mismo orden que los textos
+        """
+        if hashes is None:
+            hashes = [text_sha256(text) for text in texts]
+        analyses: List[Optional[DocumentAnalysis]] = [
+            self.analysis_cache.get(content_hash) if self.analysis_cache else None
+            for content_hash in hashes
+        ]
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        
+        if missing:
+            docs = self.nlp.pipe(
+                (texts[i] for i in missing),
+                batch_size=self.batch_size,
+                n_process=self.n_process,
+                disable=self.analysis_disabled
+            )
+            for i, doc in zip(missing, docs):
+                analyses[i] = DocumentAnalysis.from_doc(
+                    doc, hashes[i], with_entities='ner' not in self.analysis_disabled
+                )
+                if self.analysis_cache:
+                    self.analysis_cache.put(analyses[i])
+        
+        return analyses
 
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def extract_entities(self, text: str, analysis: Optional[DocumentAnalysis] = None) -> Dict[str, List[str]]:
         """
         Extrae entidades nombradas del texto usando spaCy.
         
         Args:
             text: Texto del documento
+            analysis: Análisis ya calculado (None = analizarlo aquí o tomarlo de la caché)
             
         Returns:
             Dict con las entidades encontradas por tipo
+            
+        Raises:
+            ValueError: Si el análisis se hizo sin ner
         """
-        doc = self.nlp(text)
-        entities = {
-            'ORG': [],
-            'PER': [],
-            'LOC': [],
-            'MISC': []
+        analysis = analysis or self.analyze(text)
+        return {
+            label: sorted(set(entity for entity in found if self.is_valid_entity(entity, label)))
+            for label, found in analysis.entities_by_label().items()
         }
-        
-        for ent in doc.ents:
-            if ent.label_ in entities and self.is_valid_entity(ent.text, ent.label_):
-                # Limpiar la entidad
-                cleaned_entity = ent.text.strip()
-                if cleaned_entity and cleaned_entity not in entities[ent.label_]:
-                    entities[ent.label_].append(cleaned_entity)
-        
-        return {k: sorted(list(set(v))) for k, v in entities.items()}
 
     def extract_title(self, text: str) -> str:
         """
@@ -349,25 +373,18 @@ class MetadataGenerator:
         matches = self.find_pattern_matches(text, self.patterns['document_version'])
         return matches[0] if matches else "No especificada"
 
-    def extract_keywords(self, text: str) -> List[str]:
+    def extract_keywords(self, text: str, analysis: Optional[DocumentAnalysis] = None) -> List[str]:
         """
         Extrae palabras clave del texto.
         
         Args:
             text: Texto del documento
+            analysis: Análisis ya calculado del documento (None = analizarlo aquí)
             
         Returns:
             Lista de palabras clave
         """
-        doc = self.nlp(text.lower())
-        keywords = []
-        
-        for token in doc:
-            if (not token.is_stop and not token.is_punct and token.is_alpha and
-                len(token.text) > 3):
-                keywords.append(token.lemma_)
-        
-        return sorted(list(set(keywords)))
+        return (analysis or self.analyze(text)).keywords
 
     def find_pattern_matches(self, text: str, pattern: str) -> List[str]:
         """
@@ -418,19 +435,17 @@ class MetadataGenerator:
         
         for line in lines:
             # Verificar si la línea contiene el inicio de una nueva sección
-            for section_name, pattern in self.sections.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Si ya teníamos una sección, guardarla
-                    if current_section:
-                        chunks[current_section] = '\n'.join(current_content).strip()
-                    # Iniciar nueva sección
-                    current_section = section_name
-                    current_content = [line]
-                    break
-            else:
-                # Si no es inicio de sección, agregar a la sección actual
+            section_name = self.section_scanner.match_line(line)
+            if section_name:
+                # Si ya teníamos una sección, guardarla
                 if current_section:
-                    current_content.append(line)
+                    chunks[current_section] = '\n'.join(current_content).strip()
+                # Iniciar nueva sección
+                current_section = section_name
+                current_content = [line]
+            elif current_section:
+                # Si no es inicio de sección, agregar a la sección actual
+                current_content.append(line)
         
         # Guardar la última sección
         if current_section:
@@ -438,18 +453,26 @@ class MetadataGenerator:
         
         return chunks
 
-    def generate_metadata(self, text_path: Path) -> Dict:
+    def generate_metadata(
+        self,
+        text_path: Path,
+        text: Optional[str] = None,
+        analysis: Optional[DocumentAnalysis] = None
+    ) -> Dict:
         """
         Genera metadatos para un documento según el esquema especificado.
         
         Args:
             text_path: Ruta al archivo de texto
+            text: Contenido del documento si ya está cargado (p. ej. desde el almacén columnar)
+            analysis: Análisis ya calculado en lote (None = analizarlo aquí)
             
         Returns:
             Dict con los metadatos generados
         """
         try:
-            text = text_path.read_text(encoding='utf-8')
+            if text is None:
+                text = text_path.read_text(encoding='utf-8')
             filename = text_path.stem
             
             # Extraer chunks del documento
@@ -463,7 +486,7 @@ class MetadataGenerator:
                 'file_path': str(text_path),
                 'coverage_type': self.extract_coverage_type(text),
                 'num_pages': None,  # Se obtendrá del PDF original
-                'keywords': ';'.join(self.extract_keywords(text))
+                'keywords': ';'.join(self.extract_keywords(text, analysis))
             }
             
             # Agregar chunks como metadatos adicionales
@@ -475,26 +498,220 @@ class MetadataGenerator:
             logger.error(f"Error generando metadatos para {text_path}: {str(e)}")
             return None
 
-    def process_all_documents(self) -> pd.DataFrame:
+    def iter_documents(self) -> Iterator[Tuple[Path, Optional[str]]]:
+        """
+        Recorre los documentos procesados, desde el almacén columnar si existe.
+        
+        Yields:
+            Tuple[Path, Optional[str]]: Ruta del texto y su contenido (None si hay
+            que leerlo del archivo .txt)
+        """
+        store = ExtractionStore(self.processed_dir / 'corpus')
+        if store.exists():
+            for doc_id, text in store.iter_texts():
+                yield self.processed_dir / f"{doc_id}.txt", text
+            return
+        
+        for text_path in self.processed_dir.glob('*.txt'):
+            yield text_path, None
+
+    def _iter_windows(self) -> Iterator[List[Tuple[Path, str]]]:
+        """
+        Agrupa los documentos en ventanas de DOCUMENT_WINDOW con el texto ya cargado.
+        
+        Yields:
+            Lista de (ruta del texto, contenido)
+        """
+        window = []
+        for text_path, text in self.iter_documents():
+            if text is None:
+                try:
+                    text = text_path.read_text(encoding='utf-8')
+                except Exception as e:
+                    logger.error(f"Error leyendo {text_path}: {str(e)}")
+                    continue
+            window.append((text_path, text))
+            if len(window) >= self.DOCUMENT_WINDOW:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    def _worker_kwargs(self) -> Dict:
+        """Argumentos para crear el generador en cada proceso de trabajo."""
+        return {
+            'processed_dir': str(self.processed_dir),
+            'metadata_dir': str(self.metadata_dir),
+            'batch_size': self.batch_size,
+            'n_process': 1,
+            'analysis_cache_dir': self.analysis_cache_dir,
+            'top_keywords': self.top_keywords,
+            'n_workers': 1
+        }
+
+    def _generate_shard(self, shard: List[Tuple[Path, str, str]]) -> List[Tuple[str, Dict, List[str]]]:
+        """
+        Genera los metadatos de un grupo de documentos pendientes.
+        
+        Args:
+            shard: Lista de (ruta del texto, contenido, hash SHA-256)
+            
+        Returns:
+            Lista de (hash, metadatos, lemas candidatos a palabra clave) de los
+            documentos generados correctamente
+        """
+        # Una sola pasada de nlp.pipe por grupo en lugar de un parse por documento
+        try:
+            analyses = self.analyze_batch(
+                [text for _, text, _ in shard], [sha256 for _, _, sha256 in shard]
+            )
+        except Exception as e:
+            logger.error(f"Error en el procesamiento por lotes, se procesa documento a documento: {str(e)}")
+            analyses = [None] * len(shard)
+        
+        results = []
+        for (text_path, text, sha256), analysis in zip(shard, analyses):
+            try:
+                analysis = analysis or self.analyze(text)
+            except Exception as e:
+                logger.error(f"Error analizando {text_path}: {str(e)}")
+                continue
+            metadata = self.generate_metadata(text_path, text, analysis)
+            if metadata:
+                results.append((sha256, metadata, analysis.keyword_lemmas()))
+        return results
+
+    def process_all_documents(self, incremental: bool = True) -> 'pd.DataFrame':
         """
         Procesa todos los documentos y genera sus metadatos.
         
+        En modo incremental solo se regeneran los documentos cuyo texto (hash
+        SHA-256) o versión del generador cambió respecto al manifiesto; el resto
+        (metadatos y lemas candidatos para el TF-IDF) se toma del manifiesto y se
+        fusiona en el catálogo. Con n_workers > 1 los
+        documentos pendientes se reparten en grupos entre procesos de trabajo y
+        los resultados se escriben en el catálogo a medida que llegan. Si falla
+        un grupo, sus documentos conservan los metadatos del manifiesto anterior
+        (y se reintentan en la siguiente ejecución) en lugar de desaparecer.
+        
+        Args:
+            incremental: Si reutilizar los metadatos registrados en el manifiesto
+        
         Returns:
             DataFrame con los metadatos de todos los documentos
         """
-        text_files = list(self.processed_dir.glob('*.txt'))
-        all_metadata = []
+        import pandas as pd
+        
+        # El manifiesto anterior también sirve de respaldo en una ejecución completa
+        recorded = load_manifest(self.manifest_path).get('documents', {})
+        previous = recorded if incremental else {}
+        entries: Dict[str, Dict] = {}
+        # Grupos enviados y aún sin resultado (los resultados llegan en orden)
+        submitted: Deque[List[Tuple[Path, str, str]]] = deque()
+        found = False
+        unchanged = regenerated = 0
+        progress = tqdm(desc="Generando metadatos")
+        
+        def pending_shards() -> Iterator[List[Tuple[Path, str, str]]]:
+            """Lee los documentos y entrega en grupos los que hay que regenerar."""
+            nonlocal found, unchanged
+            for window in self._iter_windows():
+                found = True
+                pending = []
+                for text_path, text in window:
+                    name = text_path.stem + '.txt'
+                    sha256 = text_sha256(text)
+                    old = previous.get(name)
+                    # Los lemas del manifiesto bastan para el TF-IDF: no hace falta
+                    # la caché de análisis para dar el documento por actualizado
+                    if (old and old.get('sha256') == sha256 and old.get('metadata')
+                            and old.get('generator_version') == self.GENERATOR_VERSION
+                            and old.get('keyword_lemmas') is not None and not old.get('stale')):
+                        entries[name] = old
+                        unchanged += 1
+                    else:
+                        pending.append((text_path, text, sha256))
+                progress.update(len(window))
+                for start in range(0, len(pending), self.WORKER_SHARD_SIZE):
+                    shard = pending[start:start + self.WORKER_SHARD_SIZE]
+                    submitted.append(shard)
+                    yield shard
+        
+        pool = None
+        if self.n_workers > 1:
+            logger.info(f"Generando metadatos con {self.n_workers} procesos de trabajo")
+            pool = SupervisedPool(
+                _generate_shard_in_worker,
+                self.n_workers,
+                initializer=_init_worker,
+                initargs=(self._worker_kwargs(),)
+            )
+            results = pool.imap(pending_shards())
+        else:
+            results = map(self._generate_shard, pending_shards())
         
-        if not text_files:
+        try:
+            for result in results:
+                shard = submitted.popleft()
+                if isinstance(result, TaskFailure):
+                    # Los documentos del grupo siguen en el manifiesto, el catálogo y
+                    # el CSV con sus metadatos anteriores, marcados para reintentarlos
+                    kept = 0
+                    for text_path, _, _ in shard:
+                        name = text_path.stem + '.txt'
+                        old = recorded.get(name)
+                        if old and old.get('metadata'):
+                            entries[name] = dict(
+                                old, keyword_lemmas=old.get('keyword_lemmas') or [], stale=True
+                            )
+                            kept += 1
+                    logger.error(
+                        f"Error generando metadatos de un grupo de {len(shard)} documentos "
+                        f"({result.reason}); se conservan los metadatos anteriores de {kept}"
+                    )
+                    continue
+                for sha256, metadata, lemmas in result:
+                    regenerated += 1
+                    entries[metadata['filename']] = {
+                        'sha256': sha256,
+                        'generator_version': self.GENERATOR_VERSION,
+                        'metadata': metadata,
+                        'keyword_lemmas': lemmas
+                    }
+                # Escritura incremental: los documentos ya generados quedan en el
+                # catálogo aunque el proceso se interrumpa
+                self.catalog.upsert_many((metadata, sha256) for sha256, metadata, _ in result)
+        finally:
+            if pool is not None:
+                pool.close()
+            progress.close()
+        
+        if not found:
             logger.warning(f"No se encontraron archivos de texto en {self.processed_dir}")
+            if incremental:
+                save_manifest({'documents': {}}, self.manifest_path)
+            if self.catalog.exists():
+                self.catalog.sync([])
             return pd.DataFrame()
         
-        for text_path in tqdm(text_files, desc="Generando metadatos"):
-            metadata = self.generate_metadata(text_path)
-            if metadata:
-                all_metadata.append(metadata)
+        # Las palabras clave dependen de todo el corpus (IDF): se recalculan en cada
+        # ejecución a partir de los lemas del manifiesto, sin volver a analizar nada
+        names = sorted(entries)
+        for name, keywords in zip(names, corpus_keywords(
+                [entries[name]['keyword_lemmas'] for name in names], self.top_keywords)):
+            entries[name]['metadata']['keywords'] = ';'.join(keywords)
+        
+        removed = len([name for name in previous if name not in entries])
+        logger.info(
+            f"Metadatos regenerados: {regenerated}, sin cambios: {unchanged}, eliminados: {removed}"
+        )
+        save_manifest({'documents': entries}, self.manifest_path)
         
-        df_metadata = pd.DataFrame(all_metadata)
+        # Orden determinista para que el catálogo no dependa del sistema de archivos
+        df_metadata = pd.DataFrame([entries[name]['metadata'] for name in names])
+        
+        # Catálogo indexado que consultan el embedder, el índice y la interfaz
+        self.catalog.sync((entries[name]['metadata'], entries[name]['sha256']) for name in names)
         
         if not df_metadata.empty:
             # Guardar metadatos en CSV
@@ -511,9 +728,27 @@ class MetadataGenerator:
 
 def main():
     """Función principal para ejecutar la generación de metadatos"""
+    parser = argparse.ArgumentParser(description="Genera los metadatos de los textos extraídos")
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help="Documentos por lote en nlp.pipe")
+    parser.add_argument('--n-process', type=int, default=1,
+                        help="Procesos de spaCy (0 = todos los núcleos)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos de trabajo (0 = todos los núcleos)")
+    parser.add_argument('--top-keywords', type=int, default=10,
+                        help="Palabras clave TF-IDF por documento (0 = todas)")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignora el manifiesto y regenera todos los documentos")
+    args = parser.parse_args()
+    
     try:
-        generator = MetadataGenerator()
-        metadata_df = generator.process_all_documents()
+        generator = MetadataGenerator(
+            batch_size=args.batch_size,
+            n_process=args.n_process or -1,
+            top_keywords=args.top_keywords or None,
+            n_workers=args.workers
+        )
+        metadata_df = generator.process_all_documents(incremental=not args.full)
         
         if not metadata_df.empty:
             print("\nResumen de la generación de metadatos:")
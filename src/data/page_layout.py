@@ -0,0 +1,138 @@
+"""
+Geometría de bloques de página y heurísticas de orden de lectura.
+
+La geometría que devuelve ``page.get_text("blocks")`` se guarda una sola vez por
+PDF (indexada por hash de contenido) en un archivo binario compacto que se
+escribe y se lee página a página: por cada página, su tamaño y número de
+bloques, las coordenadas en float64 (las mismas que da PyMuPDF, para que las
+heurísticas den idéntico resultado), la longitud de cada texto y los textos en
+UTF-8. Así el paso de maquetación (columnas, pie de página) puede re-ejecutarse
+con otros parámetros sin volver a abrir los PDFs, y ni la lectura ni la
+escritura de la caché retienen más de una página en memoria.
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# Bloque mínimo para maquetar: (x0, y0, x1, y1, texto)
+Block = Tuple[float, float, float, float, str]
+
+def layout_page_text(
+    blocks: Sequence[Sequence],
+    page_width: float,
+    page_height: float,
+    margin_bottom: float = 70,
+    column_split: float = 0.5
+) -> str:
+    """
+    Ordena los bloques de una página separando columnas y eliminando el pie de página.
+
+    Args:
+        blocks: Bloques con la forma de page.get_text("blocks") (x0, y0, x1, y1, texto, ...)
+        page_width: Ancho de la página
+        page_height: Alto de la página
+        margin_bottom: Altura del pie de página a descartar (en puntos)
+        column_split: Posición de la división entre columnas como fracción del ancho
+
+    Returns:
+        Texto de la página en orden de lectura (sin limpiar)
+    """
+    clean_blocks = []
+    for block in blocks:
+        if block[1] < page_height - margin_bottom:
+            block_text = block[4].strip()
+            if block_text and not block_text.lower().startswith("<image"):
+                clean_blocks.append(block)
+    # Separar columnas
+    split_x = page_width * column_split
+    left_col = [b for b in clean_blocks if b[0] < split_x]
+    right_col = [b for b in clean_blocks if b[0] >= split_x]
+    left_col_sorted = sorted(left_col, key=lambda b: (b[1], b[0]))
+    right_col_sorted = sorted(right_col, key=lambda b: (b[1], b[0]))
+    sorted_blocks = left_col_sorted + right_col_sorted
+    return "\n".join(block[4].strip() for block in sorted_blocks if block[4].strip())
+
+# Cabecera del archivo y de cada página (ancho, alto, número de bloques)
+_MAGIC = b'PLAYOUT1'
+_PAGE_HEADER = struct.Struct('<ddI')
+
+class LayoutCacheWriter:
+    """
+    Escritor página a página de la caché de geometría de un PDF.
+
+    Escribe en un archivo temporal que sustituye al definitivo en commit(), por
+    lo que una extracción interrumpida no deja una caché incompleta.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Ruta del archivo de caché
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(_MAGIC)
+
+    def write_page(self, width: float, height: float, blocks: Sequence[Sequence]) -> None:
+        """
+        Añade los bloques de una página.
+
+        Args:
+            width: Ancho de la página
+            height: Alto de la página
+            blocks: Bloques con la forma de page.get_text("blocks")
+        """
+        encoded = [block[4].encode('utf-8') for block in blocks]
+        self._file.write(_PAGE_HEADER.pack(width, height, len(blocks)))
+        self._file.write(np.asarray([block[:4] for block in blocks], dtype='<f8').reshape(-1, 4).tobytes())
+        self._file.write(np.asarray([len(text) for text in encoded], dtype='<i4').tobytes())
+        self._file.write(b''.join(encoded))
+
+    def commit(self) -> None:
+        """Publica la caché."""
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Descarta lo escrito."""
+        self._file.close()
+        if self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+def iter_cached_pages(path: Path) -> Iterator[Tuple[float, float, List[Block]]]:
+    """
+    Recorre las páginas de una caché de geometría sin cargar el archivo completo.
+
+    Args:
+        path: Ruta del archivo de caché
+
+    Yields:
+        Tuple: ancho, alto y lista de bloques (x0, y0, x1, y1, texto) de cada página
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Formato de caché de maquetación no reconocido: {path}")
+        while True:
+            header = f.read(_PAGE_HEADER.size)
+            if not header:
+                return
+            if len(header) != _PAGE_HEADER.size:
+                raise ValueError(f"Caché de maquetación truncada: {path}")
+            width, height, n_blocks = _PAGE_HEADER.unpack(header)
+            bbox = np.frombuffer(f.read(n_blocks * 32), dtype='<f8').reshape(-1, 4)
+            lengths = np.frombuffer(f.read(n_blocks * 4), dtype='<i4')
+            raw = f.read(int(lengths.sum()))
+            if len(bbox) != n_blocks or len(lengths) != n_blocks or len(raw) != int(lengths.sum()):
+                raise ValueError(f"Caché de maquetación truncada: {path}")
+            blocks = []
+            offset = 0
+            for (x0, y0, x1, y1), length in zip(bbox.tolist(), lengths.tolist()):
+                blocks.append((x0, y0, x1, y1, raw[offset:offset + length].decode('utf-8')))
+                offset += length
+            yield width, height, blocks
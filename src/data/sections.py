@@ -0,0 +1,79 @@
+"""
+Detección de las secciones estándar de los documentos IPID.
+
+Todos los encabezados se combinan en una única expresión regular con un grupo
+con nombre por sección, de modo que el texto se recorre una sola vez sea cual
+sea el número de tipos de sección. Lo usan tanto la generación de metadatos
+(MetadataGenerator.extract_chunks) como el chunking de embeddings
+(DocumentEmbedder.chunk_text).
+"""
+
+import re
+from typing import Dict, Iterator, Optional, Tuple
+
+# Encabezados de sección en orden de prioridad (se comparan sin distinguir mayúsculas)
+SECTION_PATTERNS: Dict[str, str] = {
+    'consiste': r'en\s+qué\s+consiste\s+este\s+tipo\s+de\s+seguro',
+    'asegurado': r'qué\s+se\s+asegura',
+    'no_asegurado': r'qué\s+no\s+está\s+asegurado',
+    'sumas': r'sumas\s+aseguradas',
+    'restricciones': r'existen\s+restricciones\s+en\s+lo\s+que\s+respecta\s+a\s+la\s+cobertura',
+    'cobertura': r'dónde\s+estoy\s+cubierto',
+    'obligaciones': r'cuáles\s+son\s+mis\s+obligaciones',
+    'pagos': r'cuándo\s+y\s+cómo\s+tengo\s+que\s+efectuar\s+los\s+pagos',
+    'vigencia': r'cuándo\s+comienza\s+y\s+finaliza\s+la\s+cobertura',
+    'rescindir': r'cómo\s+puedo\s+rescindir\s+el\s+contrato'
+}
+
+class SectionScanner:
+    """
+    Buscador de encabezados de sección en una sola pasada.
+    """
+
+    def __init__(self, patterns: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            patterns: Nombre de sección -> expresión regular del encabezado, en orden
+                de prioridad (por defecto, SECTION_PATTERNS). Los nombres deben ser
+                identificadores válidos de Python.
+        """
+        self.patterns = dict(patterns or SECTION_PATTERNS)
+        self.priority = {name: i for i, name in enumerate(self.patterns)}
+        self._regex = re.compile(
+            '|'.join(f'(?P<{name}>{pattern})' for name, pattern in self.patterns.items()),
+            re.IGNORECASE
+        )
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str, str]]:
+        """
+        Recorre los encabezados de sección del texto en orden de aparición.
+
+        Args:
+            text: Texto del documento
+
+        Yields:
+            Tuple: inicio, fin, nombre de la sección y texto del encabezado
+        """
+        for match in self._regex.finditer(text):
+            yield match.start(), match.end(), match.lastgroup, match.group()
+
+    def match_line(self, line: str) -> Optional[str]:
+        """
+        Indica qué sección abre una línea.
+
+        Si la línea contiene varios encabezados gana el de mayor prioridad.
+
+        Args:
+            line: Línea de texto
+
+        Returns:
+            Nombre de la sección o None si la línea no contiene ningún encabezado
+        """
+        best = None
+        for match in self._regex.finditer(line):
+            if best is None or self.priority[match.lastgroup] < self.priority[best]:
+                best = match.lastgroup
+        return best
+
+# Instancia compartida con los encabezados estándar
+DEFAULT_SCANNER = SectionScanner()
@@ -0,0 +1,67 @@
+"""
+Motor de limpieza de texto con expresiones regulares precompiladas.
+
+Aplica las mismas reglas que la limpieza línea a línea original, pero sobre el
+documento completo y en pocas pasadas: los patrones que antes usaban ``\\s``
+dentro de una línea usan ``[^\\S\\n]`` (espacio en blanco salvo salto de línea),
+de modo que ninguna regla cruza los límites de línea y el resultado es idéntico.
+"""
+
+import re
+from typing import List, Pattern, Tuple
+
+# Espacio en blanco horizontal: cualquier \s salvo el salto de línea
+_HSPACE = r'[^\S\n]'
+
+_LOWER = 'a-záéíóúñ'
+_UPPER = 'A-ZÁÉÍÓÚÑ'
+_LETTER = 'A-Za-záéíóúÁÉÍÓÚñÑ'
+_PUNCT = '.,;:¿?¡!'
+
+# Reglas en el orden en que se aplican (patrón compilado, reemplazo)
+_CLEANING_RULES: List[Tuple[Pattern, str]] = [
+    # Reemplazar caracteres especiales manteniendo puntuación básica
+    # (\s incluye el salto de línea, que por tanto se conserva)
+    (re.compile(r'[^\w\sáéíóúÁÉÍÓÚñÑ.,;:¿?¡!()\-]'), ' '),
+    # Unir palabras separadas incorrectamente y separar las unidas: equivale a
+    # las dos reglas originales 'minúscula + espacios + mayúscula' -> unir y
+    # 'minúscula + mayúscula' -> separar
+    (re.compile(rf'(?<=[{_LOWER}]){_HSPACE}*(?=[{_UPPER}])'), ' '),
+    # Separar números y letras en ambos sentidos
+    (re.compile(rf'\d(?=[{_LETTER}])|[{_LETTER}](?=\d)'), r'\g<0> '),
+    # Eliminar espacios múltiples (un espacio suelto ya es la salida esperada)
+    (re.compile(r'[ \t]{2,}|\t'), ' '),
+    # Corregir espacios alrededor de puntuación
+    (re.compile(rf'{_HSPACE}+([{_PUNCT}])'), r'\1'),
+    (re.compile(rf'([{_PUNCT}]){_HSPACE}+'), r'\1 '),
+    # Corregir espacios en paréntesis
+    (re.compile(rf'\({_HSPACE}+'), '('),
+    (re.compile(rf'{_HSPACE}+\)'), ')'),
+    # Corregir espacios en guiones
+    (re.compile(rf'{_HSPACE}+-{_HSPACE}+'), '-'),
+    # Recortar cada línea (equivale a line.strip())
+    (re.compile(rf'^{_HSPACE}+|{_HSPACE}+$', re.MULTILINE), ''),
+    # Eliminar líneas vacías múltiples
+    (re.compile(r'\n\s*\n\s*\n+'), '\n\n'),
+]
+# La regla original de símbolos de moneda ('(\d+)\s*([€$])\s*(\d*)') no se
+# incluye: la primera regla ya sustituye '€' y '$' por espacios, así que nunca
+# podía coincidir.
+
+def clean_text(text: str) -> str:
+    """
+    Limpia el texto extraído del PDF preservando los retornos de carro.
+
+    Args:
+        text: Texto a limpiar
+
+    Returns:
+        Texto limpio
+    """
+    # Normalizar retornos de carro
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+    for pattern, replacement in _CLEANING_RULES:
+        text = pattern.sub(replacement, text)
+
+    return text.strip()
@@ -0,0 +1,251 @@
+"""
+Pool de procesos supervisado con límite de tiempo y de memoria por tarea.
+
+A diferencia de ProcessPoolExecutor, el supervisor puede matar un proceso de
+trabajo colgado o que consume demasiada memoria, registrar la tarea como fallida
+y arrancar un proceso nuevo sin interrumpir el resto del lote.
+"""
+
+import logging
+import multiprocessing as mp
+import time
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+class TaskFailure:
+    """
+    Resultado de una tarea que no terminó correctamente.
+    """
+
+    def __init__(self, reason: str):
+        """
+        Args:
+            reason: Descripción legible del fallo
+        """
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"TaskFailure({self.reason!r})"
+
+def _worker_main(conn, func: Callable, initializer: Optional[Callable], initargs: Sequence) -> None:
+    """Bucle del proceso de trabajo: inicializa una vez y atiende tareas hasta recibir None."""
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        index, item = task
+        try:
+            conn.send((index, True, func(item)))
+        except MemoryError:
+            conn.send((index, False, "Memoria agotada en el proceso de trabajo"))
+        except Exception as e:
+            conn.send((index, False, f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    """Estado de un proceso de trabajo supervisado."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task_index: Optional[int] = None
+        self.started_at = 0.0
+
+class SupervisedPool:
+    """
+    Pool de procesos que supervisa cada tarea con un presupuesto de tiempo y memoria.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        n_workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: Sequence = (),
+        task_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        poll_interval: float = 0.5,
+        start_method: Optional[str] = None
+    ):
+        """
+        Inicializa el pool y arranca los procesos de trabajo.
+
+        Args:
+            func: Función (a nivel de módulo) que procesa un elemento
+            n_workers: Número de procesos de trabajo
+            initializer: Función que se ejecuta una vez al arrancar cada proceso
+            initargs: Argumentos del inicializador
+            task_timeout: Tiempo máximo en segundos por tarea (None = sin límite)
+            memory_limit_mb: Memoria residente máxima por proceso en MB (None = sin límite)
+            poll_interval: Cada cuántos segundos se revisan los límites
+            start_method: Método de arranque de los procesos ('fork', 'spawn'...);
+                None = el de la plataforma. 'spawn' evita heredar el estado de
+                hilos de librerías como PyTorch ya cargadas en el proceso principal
+        """
+        self.func = func
+        self.n_workers = max(1, n_workers)
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self.task_timeout = task_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.poll_interval = poll_interval
+        self.restarts = 0
+
+        self._context = mp.get_context(start_method)
+        self._workers = [self._start_worker() for _ in range(self.n_workers)]
+
+    def __enter__(self) -> 'SupervisedPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start_worker(self) -> _Worker:
+        """Arranca un proceso de trabajo nuevo."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.func, self.initializer, self.initargs),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _replace_worker(self, worker: _Worker) -> _Worker:
+        """Mata un proceso de trabajo y lo sustituye por uno nuevo."""
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+        worker.conn.close()
+        self.restarts += 1
+        new_worker = self._start_worker()
+        self._workers[self._workers.index(worker)] = new_worker
+        return new_worker
+
+    def _memory_mb(self, worker: _Worker) -> float:
+        """Memoria residente del proceso de trabajo en MB."""
+        import psutil
+        try:
+            return psutil.Process(worker.process.pid).memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return 0.0
+
+    def _check_worker(self, worker: _Worker, ready: set, now: float) -> Optional[Any]:
+        """
+        Revisa un proceso ocupado y devuelve el resultado de su tarea si ya terminó.
+
+        Returns:
+            Resultado, TaskFailure o None si la tarea sigue en curso
+        """
+        if worker.conn in ready or worker.conn.poll():
+            try:
+                _, ok, payload = worker.conn.recv()
+                return payload if ok else TaskFailure(payload)
+            except (EOFError, OSError):
+                pass
+
+        if not worker.process.is_alive():
+            reason = f"El proceso de trabajo terminó inesperadamente (código {worker.process.exitcode})"
+            self._replace_worker(worker)
+            return TaskFailure(reason)
+
+        if self.task_timeout is not None and now - worker.started_at > self.task_timeout:
+            self._replace_worker(worker)
+            return TaskFailure(f"Tiempo límite excedido ({self.task_timeout:g}s)")
+
+        if self.memory_limit_mb is not None:
+            memory_mb = self._memory_mb(worker)
+            if memory_mb > self.memory_limit_mb:
+                self._replace_worker(worker)
+                return TaskFailure(
+                    f"Límite de memoria excedido ({memory_mb:.0f} MB > {self.memory_limit_mb} MB)"
+                )
+
+        return None
+
+    def imap(self, items: Iterable[Any], max_buffered: Optional[int] = None) -> Iterator[Any]:
+        """
+        Procesa los elementos y devuelve los resultados en el orden de entrada.
+
+        Los elementos se consumen de forma perezosa a medida que hay procesos
+        libres, así que ``items`` puede ser un generador que lee datos bajo demanda.
+        Los elementos que fallan, agotan el tiempo o la memoria producen un
+        TaskFailure en su posición en lugar de interrumpir el lote.
+
+        Args:
+            items: Elementos a procesar
+            max_buffered: Resultados fuera de orden que se retienen como máximo antes
+                de dejar de repartir tareas (por defecto, 4 por proceso)
+
+        Yields:
+            Resultado de func o TaskFailure para cada elemento
+        """
+        source = enumerate(items)
+        exhausted = False
+        max_buffered = max_buffered or 4 * self.n_workers
+        results: Dict[int, Any] = {}
+        next_index = 0
+
+        while True:
+            # Asignar tareas a los procesos libres
+            for worker in list(self._workers):
+                if exhausted or len(results) >= max_buffered:
+                    break
+                if worker.task_index is not None:
+                    continue
+                try:
+                    index, item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if not worker.process.is_alive():
+                    worker = self._replace_worker(worker)
+                worker.conn.send((index, item))
+                worker.task_index = index
+                worker.started_at = time.monotonic()
+
+            busy = [w for w in self._workers if w.task_index is not None]
+            if not busy and exhausted:
+                break
+            handles = [w.conn for w in busy] + [w.process.sentinel for w in busy]
+            ready = set(wait(handles, timeout=self.poll_interval))
+            now = time.monotonic()
+
+            for worker in busy:
+                index = worker.task_index
+                result = self._check_worker(worker, ready, now)
+                if result is None:
+                    continue
+                if isinstance(result, TaskFailure):
+                    logger.warning(f"Tarea {index} fallida: {result.reason}")
+                results[index] = result
+                worker.task_index = None
+
+            # Entregar los resultados disponibles respetando el orden
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+    def close(self) -> None:
+        """Detiene ordenadamente todos los procesos de trabajo."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
@@ -4,20 +4,29 @@ Script para generar embeddings de documentos de seguros.
 
 import os
 import json
+import hashlib
+import time
+import argparse
 import logging
-import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
-import re
 import unicodedata
 
+from src.data.catalog import DocumentCatalog
+from src.data.extraction_store import ExtractionStore
+from src.data.sections import DEFAULT_SCANNER, SECTION_PATTERNS
+from src.embeddings.embedding_cache import EmbeddingCache, text_key
+from src.embeddings.embedding_store import DTYPES, EmbeddingStoreWriter
+from src.embeddings.encoder_backend import BACKENDS, encode_token_ids, load_encoder
+from src.embeddings.encoding_pool import EncodingPool
 from src.monitoring.performance import PerformanceMonitor
 
+# torch, sentence-transformers y pandas se importan al usarse: importar el
+# módulo no debe cargar el stack de PyTorch
+
 # Configuración del logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,25 +64,23 @@ class DocumentEmbedder:
     ]
     
     # Secciones específicas para chunking
-    SECTIONS = {
-        'consiste': r'(?i)en\s+qué\s+consiste\s+este\s+tipo\s+de\s+seguro',
-        'asegurado': r'(?i)qué\s+se\s+asegura',
-        'no_asegurado': r'(?i)qué\s+no\s+está\s+asegurado',
-        'sumas': r'(?i)sumas\s+aseguradas',
-        'restricciones': r'(?i)existen\s+restricciones\s+en\s+lo\s+que\s+respecta\s+a\s+la\s+cobertura',
-        'cobertura': r'(?i)dónde\s+estoy\s+cubierto',
-        'obligaciones': r'(?i)cuáles\s+son\s+mis\s+obligaciones',
-        'pagos': r'(?i)cuándo\s+y\s+cómo\s+tengo\s+que\s+efectuar\s+los\s+pagos',
-        'vigencia': r'(?i)cuándo\s+comienza\s+y\s+finaliza\s+la\s+cobertura',
-        'rescindir': r'(?i)cómo\s+puedo\s+rescindir\s+el\s+contrato'
-    }
+    SECTIONS = SECTION_PATTERNS
     
     def __init__(
         self,
         model_name: str = "paraphrase-multilingual-mpnet-base-v2",
         device: str = None,
         chunk_size: int = 512,
-        chunk_overlap: int = 50
+        chunk_overlap: int = 50,
+        batch_size: int = 64,
+        cache_path: Optional[str] = "data/cache/embeddings.sqlite",
+        cache_max_mb: float = 1024,
+        model_revision: Optional[str] = None,
+        backend: str = "torch",
+        encode_workers: int = 1,
+        threads_per_worker: Optional[int] = None,
+        store_path: str = "data/embeddings/store",
+        store_dtype: str = "float32"
     ):
         """
         Inicializa el generador de embeddings.
@@ -81,27 +88,86 @@ class DocumentEmbedder:
         Args:
             model_name: Nombre del modelo de Sentence Transformers
             device: Dispositivo a usar (cuda/cpu)
-            chunk_size: Tamaño de los chunks de texto
-            chunk_overlap: Superposición entre chunks
+            chunk_size: Tamaño máximo de los chunks en tokens (limitado por el
+                max_seq_length del modelo)
+            chunk_overlap: Tokens compartidos entre ventanas consecutivas de una sección
+            batch_size: Chunks por lote al codificar todo el corpus
+            cache_path: Base de datos de la caché de embeddings (None = sin caché)
+            cache_max_mb: Tamaño máximo de la caché de embeddings, en MB
+            model_revision: Revisión (commit) del modelo; por defecto la del
+                modelo descargado
+            backend: Backend de inferencia ('torch', 'onnx' u 'onnx-int8')
+            encode_workers: Procesos de trabajo que codifican en CPU (1 = en el
+                proceso principal, 0 = todos los núcleos)
+            threads_per_worker: Hilos de inferencia de cada proceso (por defecto
+                los núcleos repartidos entre los procesos)
+            store_path: Directorio del almacén consolidado de embeddings
+            store_dtype: Tipo de los vectores en el almacén ('float32' o 'float16')
         """
-        # Determinar dispositivo
-        if device is None:
+        import torch
+        
+        # Determinar dispositivo (los backends ONNX se ejecutan en CPU)
+        if backend != "torch":
+            self.device = "cpu"
+        elif device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
             
         # Cargar modelo
-        self.model = SentenceTransformer(model_name, device=self.device)
+        self.backend = backend
+        self.model = load_encoder(model_name, backend, device=self.device, revision=model_revision)
+        self.model_revision = model_revision or self._resolve_model_revision()
+        
+        # Caché de embeddings direccionada por (modelo, revisión, texto); los
+        # vectores de cada backend se guardan aparte porque no son idénticos
+        cache_model_name = model_name if backend == "torch" else f"{model_name}[{backend}]"
+        self.embedding_cache = (
+            EmbeddingCache(cache_model_name, self.model_revision, cache_path, cache_max_mb)
+            if cache_path else None
+        )
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.store_path = store_path
+        self.store_dtype = store_dtype
+        
+        # Tokens por ventana: chunk_size sin superar lo que el modelo procesa
+        # sin truncar (descontando los tokens especiales)
+        self.tokenizer = self.model.tokenizer
+        self.window_tokens = (
+            min(chunk_size, self.model.max_seq_length) - self.tokenizer.num_special_tokens_to_add()
+        )
+        if self.chunk_overlap >= self.window_tokens:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) debe ser menor que el tamaño de ventana ({self.window_tokens})"
+            )
+        # Ids de tokens de los chunks calculados al dividir, para no volver a
+        # tokenizarlos al codificar. Se indexan por el digest del texto (no por el
+        # texto) y se vacían al terminar cada llamada a generate_embeddings
+        self._token_ids: Dict[bytes, np.ndarray] = {}
+        
+        # Pool de codificación multiproceso (solo CPU); se arranca al primer uso
+        # y se reutiliza para todos los documentos
+        self.model_name = model_name
+        self.encode_workers = encode_workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self._encoding_pool: Optional[EncodingPool] = None
         
         # Inicializar logger y monitor
         self.logger = logging.getLogger("DocumentEmbedder")
         self.logger.setLevel(logging.INFO)
         self.performance_monitor = PerformanceMonitor()
         
-        self.logger.info(f"Inicializado DocumentEmbedder - Model: {model_name}, Device: {self.device}, Chunk size: {chunk_size}")
+        self.logger.info(f"Inicializado DocumentEmbedder - Model: {model_name}, Backend: {backend}, Device: {self.device}, Chunk size: {chunk_size}")
+    
+    def _resolve_model_revision(self) -> Optional[str]:
+        """Obtiene el commit del modelo descargado del Hub, si se conoce."""
+        try:
+            return getattr(self.model[0].auto_model.config, '_commit_hash', None)
+        except (AttributeError, IndexError, TypeError):
+            return None
     
     def validate_metadata(self, metadata: Dict[str, Any], filename: str) -> Dict[str, Any]:
         """
@@ -197,60 +263,81 @@ class DocumentEmbedder:
         normalized = normalized.encode('ASCII', 'ignore').decode('ASCII')
         return normalized
 
+    def iter_processed_texts(self, data_path: Path) -> Iterator[Tuple[str, str]]:
+        """
+        Recorre los textos procesados, desde el almacén columnar si existe o desde los .txt.
+        
+        Args:
+            data_path: Directorio de textos procesados
+            
+        Yields:
+            Tuple[str, str]: Nombre del archivo de texto y su contenido
+        """
+        store = ExtractionStore(data_path / "corpus")
+        if store.exists():
+            # Solo se leen las columnas de texto, con memory-map
+            for doc_id, content in store.iter_texts():
+                yield f"{doc_id}.txt", content
+            return
+        
+        for txt_file in data_path.glob("*.txt"):
+            try:
+                with open(txt_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                self.logger.error(f"Error leyendo archivo {txt_file}: {str(e)}")
+                continue
+            yield txt_file.name, content
+
+    @PerformanceMonitor.function_timer("document_loading")
     def load_documents(self) -> List[Dict[str, Any]]:
         """Carga los documentos y sus metadatos."""
+        # Catálogo indexado generado por la etapa de metadatos (consulta por documento)
+        catalog = DocumentCatalog("data/metadata/catalog.sqlite")
+        if catalog.exists():
+            with catalog:
+                return self._load_documents_from_catalog(catalog)
+        
         # Cargar metadatos
         metadata_path = Path("data/metadata/metadata.csv")
         if not metadata_path.exists():
             raise FileNotFoundError("No se encontró el archivo de metadatos")
         
+        import pandas as pd
+        
         # Cargar CSV con codificación UTF-8
         metadata_df = pd.read_csv(metadata_path, encoding='utf-8')
         
-        # Convertir a diccionario usando filename como índice
-        metadata_dict = {}
-        for _, row in metadata_df.iterrows():
-            filename = row['filename']
-            # Eliminar la extensión .pdf del nombre del archivo
-            base_filename = Path(filename).stem
-            metadata = row.to_dict()
-            metadata_dict[filename] = metadata
-            
-        self.logger.info(f"Metadatos cargados exitosamente - Total documentos: {len(metadata_dict)}, Columnas: {list(metadata_df.columns)}")
+        # Índice nombre normalizado -> metadatos, construido una sola vez
+        metadata_index = {}
+        collisions = {}
+        for metadata in metadata_df.to_dict('records'):
+            normalized_name = self.normalize_filename(metadata['filename'])
+            if normalized_name in metadata_index:
+                collisions.setdefault(normalized_name, [metadata_index[normalized_name]['filename']])
+                collisions[normalized_name].append(metadata['filename'])
+                continue
+            metadata_index[normalized_name] = metadata
+        
+        self.logger.info(f"Metadatos cargados exitosamente - Total documentos: {len(metadata_index)}, Columnas: {list(metadata_df.columns)}")
+        for normalized_name, filenames in collisions.items():
+            self.logger.warning(f"Metadatos con el mismo nombre normalizado '{normalized_name}': {filenames}; se usa {filenames[0]}")
         
         # Procesar cada archivo de texto
         documents = []
-        data_path = Path("data/processed")
+        unmatched = []
+        start_time = time.perf_counter()
         
-        for txt_file in data_path.glob("*.txt"):
-            # Obtener el nombre base sin extensión
-            txt_base_name = txt_file.stem + '.txt'
-            
-            # Normalizar el nombre del archivo
-            normalized_txt_name = self.normalize_filename(txt_base_name)
-            
-
-                
-            # Buscar metadatos normalizando el nombre del archivo
-            metadata = None
-            for filename, meta in metadata_dict.items():
-                if self.normalize_filename(filename) == normalized_txt_name:
-                    metadata = meta.copy()
-                    # Usar solo el nombre base sin extensión
-                    metadata['filename'] = Path(metadata['filename']).stem
-                    break
-            
-            if not metadata:
-                self.logger.warning(f"No se encontraron metadatos para {txt_base_name}")
-                continue
-                
-            # Leer contenido del archivo
-            try:
-                with open(txt_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except Exception as e:
-                self.logger.error(f"Error leyendo archivo {txt_file}: {str(e)}")
+        for txt_base_name, content in self.iter_processed_texts(Path("data/processed")):
+            # Buscar metadatos por el nombre normalizado del archivo
+            metadata = metadata_index.get(self.normalize_filename(txt_base_name))
+            if metadata is None:
+                unmatched.append(txt_base_name)
                 continue
+            
+            metadata = metadata.copy()
+            # Usar solo el nombre base sin extensión
+            metadata['filename'] = Path(metadata['filename']).stem
                 
             # Crear documento con contenido y metadatos
             document = {
@@ -258,16 +345,81 @@ class DocumentEmbedder:
                 'metadata': metadata
             }
             documents.append(document)
+        
+        self._report_loading(len(documents), unmatched, time.perf_counter() - start_time)
             
         if not documents:
             raise ValueError("No se pudieron cargar documentos válidos")
             
         return documents
     
-    def chunk_text(self, text: str) -> List[Dict[str, str]]:
+    def _load_documents_from_catalog(self, catalog: DocumentCatalog) -> List[Dict[str, Any]]:
+        """
+        Carga los documentos buscando los metadatos de cada texto en el catálogo.
+        
+        Args:
+            catalog: Catálogo de documentos abierto
+            
+        Returns:
+            Lista de documentos con contenido y metadatos
+        """
+        self.logger.info(f"Metadatos desde el catálogo {catalog.path} - Total documentos: {catalog.count()}")
+        
+        documents = []
+        unmatched = []
+        start_time = time.perf_counter()
+        for txt_base_name, content in self.iter_processed_texts(Path("data/processed")):
+            matches = catalog.find_by_name(txt_base_name)
+            if not matches:
+                unmatched.append(txt_base_name)
+                continue
+            if len(matches) > 1:
+                self.logger.warning(
+                    f"Metadatos con el mismo nombre normalizado para {txt_base_name}: "
+                    f"{[match['filename'] for match in matches]}; se usa {matches[0]['filename']}"
+                )
+            
+            metadata = matches[0]
+            # Usar solo el nombre base sin extensión
+            metadata['filename'] = Path(metadata['filename']).stem
+            documents.append({
+                'content': content,
+                'metadata': metadata
+            })
+        
+        self._report_loading(len(documents), unmatched, time.perf_counter() - start_time)
+        
+        if not documents:
+            raise ValueError("No se pudieron cargar documentos válidos")
+        
+        return documents
+    
+    def _report_loading(self, loaded: int, unmatched: List[str], elapsed: float) -> None:
+        """
+        Registra el resultado de la carga de documentos.
+        
+        Args:
+            loaded: Documentos cargados con metadatos
+            unmatched: Archivos de texto sin metadatos
+            elapsed: Tiempo de la carga en segundos
+        """
+        if unmatched:
+            shown = ', '.join(unmatched[:20]) + (' ...' if len(unmatched) > 20 else '')
+            self.logger.warning(f"No se encontraron metadatos para {len(unmatched)} archivos: {shown}")
+        total = loaded + len(unmatched)
+        rate = total / elapsed if elapsed > 0 else float('inf')
+        self.logger.info(
+            f"Documentos cargados: {loaded} de {total} textos en {elapsed:.2f}s ({rate:.0f} textos/s)"
+        )
+    
+    def chunk_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Divide el texto en chunks basados en secciones específicas.
         
+        Las secciones que superan window_tokens se dividen en ventanas solapadas
+        (ver split_section); cada chunk indica en section_index la sección de la
+        que procede.
+        
         Args:
             text: Texto a dividir
             
@@ -277,14 +429,11 @@ class DocumentEmbedder:
         chunks = []
         current_position = 0
         
-        # Encontrar todas las secciones en el texto
-        section_matches = []
-        for section_name, pattern in self.SECTIONS.items():
-            for match in re.finditer(pattern, text):
-                section_matches.append((match.start(), section_name, match.group()))
-        
-        # Ordenar secciones por posición
-        section_matches.sort(key=lambda x: x[0])
+        # Encontrar todas las secciones en el texto (una sola pasada, ya en orden)
+        section_matches = [
+            (start, section_name, section_title)
+            for start, _, section_name, section_title in DEFAULT_SCANNER.finditer(text)
+        ]
         
         # Crear chunks para cada sección
         for i, (start, section_name, section_title) in enumerate(section_matches):
@@ -306,94 +455,330 @@ class DocumentEmbedder:
                 'end_position': end
             }
             
-            chunks.append(chunk)
+            chunks.extend(self.split_section(chunk, i))
             
         # Si no se encontraron secciones, crear un chunk con todo el texto
         if not chunks:
-            chunks.append({
+            chunks.extend(self.split_section({
                 'text': text,
                 'section': 'general',
                 'section_title': 'Contenido General',
                 'start_position': 0,
                 'end_position': len(text)
-            })
+            }, 0))
             
         return chunks
     
+    def split_section(self, chunk: Dict[str, Any], section_index: int) -> List[Dict[str, Any]]:
+        """
+        Divide una sección en ventanas de como máximo window_tokens tokens.
+        
+        Las ventanas consecutivas comparten chunk_overlap tokens y sus límites
+        se toman de los offsets del tokenizer del modelo. Los ids de tokens de
+        cada ventana se guardan para reutilizarlos al codificar.
+        
+        Args:
+            chunk: Chunk de la sección completa
+            section_index: Posición de la sección en el documento
+            
+        Returns:
+            Lista de chunks (uno si la sección cabe entera)
+        """
+        encoding = self.tokenizer(
+            chunk['text'], add_special_tokens=False, return_offsets_mapping=True
+        )
+        ids = np.asarray(encoding['input_ids'], dtype=np.int32)
+        offsets = encoding['offset_mapping']
+        
+        stride = self.window_tokens - self.chunk_overlap
+        starts = range(0, max(len(ids) - self.chunk_overlap, 1), stride)
+        
+        windows = []
+        for window_index, start in enumerate(starts):
+            end = min(start + self.window_tokens, len(ids))
+            if len(starts) == 1:
+                text = chunk['text']
+                start_position, end_position = chunk['start_position'], chunk['end_position']
+            else:
+                text = chunk['text'][offsets[start][0]:offsets[end - 1][1]]
+                start_position = chunk['start_position'] + offsets[start][0]
+                end_position = chunk['start_position'] + offsets[end - 1][1]
+            self._token_ids[self._ids_key(text)] = ids[start:end]
+            windows.append({
+                **chunk,
+                'text': text,
+                'start_position': start_position,
+                'end_position': end_position,
+                'section_index': section_index,
+                'window_index': window_index,
+                'num_windows': len(starts),
+                'num_tokens': end - start
+            })
+        return windows
+    
     @PerformanceMonitor.function_timer("embedding_generation")
     def generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
-        Genera embeddings para una lista de textos.
+        Genera embeddings para una lista de textos en lotes densos.
+        
+        Los textos se ordenan por longitud en tokens para que cada lote tenga
+        textos de tamaño parecido (poco relleno), se codifican en lotes de
+        batch_size y los vectores se devuelven en el orden original. Se usa
+        igual para los chunks de un documento que para los de todo el corpus.
         
         Args:
             texts: Lista de textos
             
         Returns:
-            Matriz de embeddings
+            Matriz de embeddings, una fila por texto en el orden de entrada
         """
-        return self.model.encode(
-            texts,
-                convert_to_tensor=True,
-                device=self.device
-        ).cpu().numpy()
+        try:
+            return self._encode_cached(texts, self._encode_sorted_batches)
+        finally:
+            # Ids de los chunks que vinieron de la caché de embeddings o de una
+            # llamada interrumpida: no se van a usar
+            self._token_ids.clear()
+    
+    def _use_encoding_pool(self) -> bool:
+        """Indica si se codifica con el pool multiproceso."""
+        return self.encode_workers > 1 and self.device == "cpu"
+    
+    def _get_encoding_pool(self) -> EncodingPool:
+        """Arranca el pool de codificación la primera vez que se necesita."""
+        if self._encoding_pool is None:
+            self._encoding_pool = EncodingPool(
+                self.model_name,
+                self.backend,
+                self.encode_workers,
+                self.threads_per_worker,
+                self.model_revision
+            )
+            self.logger.info(
+                f"Pool de codificación: {self._encoding_pool.n_workers} procesos x "
+                f"{self._encoding_pool.threads_per_worker} hilos"
+            )
+        return self._encoding_pool
     
-    def process_documents(self) -> None:
+    def close(self) -> None:
+        """Detiene el pool de codificación, si se arrancó."""
+        if self._encoding_pool is not None:
+            self._encoding_pool.close()
+            self._encoding_pool = None
+    
+    def _encode_cached(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Codifica textos enviando al modelo solo los que no están en la caché.
+        
+        Los textos repetidos (tras normalizarlos) se codifican una sola vez.
+        
+        Args:
+            texts: Lista de textos
+            encode: Función que codifica una lista de textos
+            
+        Returns:
+            Matriz de embeddings, una fila por texto en el orden de entrada
+        """
+        if self.embedding_cache is None or not texts:
+            return encode(texts)
+        
+        keys = [text_key(text) for text in texts]
+        vectors = self.embedding_cache.get_many(keys)
+        
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            encoded = encode(list(missing.values()))
+            new_vectors = dict(zip(missing, encoded))
+            self.embedding_cache.put_many(new_vectors.items())
+            vectors.update(new_vectors)
+        
+        self.logger.debug(f"Caché de embeddings: {len(texts) - len(missing)} de {len(texts)} chunks reutilizados")
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+    
+    @staticmethod
+    def _ids_key(text: str) -> bytes:
+        """Clave de un texto en la memoria de ids de tokens."""
+        return hashlib.sha1(text.encode('utf-8')).digest()
+    
+    def token_ids(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Obtiene los ids de tokens de cada texto (sin tokens especiales).
+        
+        Reutiliza los calculados por split_section y solo tokeniza el resto,
+        truncando a window_tokens como haría el modelo.
+        
+        Args:
+            texts: Lista de textos
+            
+        Returns:
+            Ids de tokens de cada texto
+        """
+        token_ids = [self._token_ids.pop(self._ids_key(text), None) for text in texts]
+        missing = [i for i, ids in enumerate(token_ids) if ids is None]
+        if missing:
+            encoded = self.tokenizer(
+                [texts[i] for i in missing],
+                add_special_tokens=False,
+                truncation=True,
+                max_length=self.window_tokens
+            )['input_ids']
+            for i, ids in zip(missing, encoded):
+                token_ids[i] = np.asarray(ids, dtype=np.int32)
+        return token_ids
+    
+    def _encode_sorted_batches(self, texts: List[str]) -> np.ndarray:
+        """Codifica textos en lotes ordenados por longitud en tokens, a partir de sus ids."""
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        token_ids = self.token_ids(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(token_ids[i]), reverse=True)
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        
+        if self._use_encoding_pool():
+            # Los lotes se reparten entre los procesos y vuelven en orden
+            results = self._get_encoding_pool().imap([token_ids[i] for i in batch] for batch in batches)
+        else:
+            results = (encode_token_ids(self.model, [token_ids[i] for i in batch]) for batch in batches)
+        
+        embeddings = None
+        for batch, batch_embeddings in tqdm(zip(batches, results), total=len(batches), desc="Codificando lotes"):
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=batch_embeddings.dtype)
+            embeddings[batch] = batch_embeddings
+            # Los ids de un lote ya codificado no se vuelven a usar
+            for i in batch:
+                token_ids[i] = None
+        return embeddings
+    
+    def _save_document(
+        self,
+        doc: Dict[str, Any],
+        chunks: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        store: EmbeddingStoreWriter
+    ) -> Dict[str, Any]:
+        """
+        Añade los embeddings y los metadatos de un documento al almacén.
+        
+        Args:
+            doc: Documento con contenido y metadatos
+            chunks: Chunks del documento
+            embeddings: Embeddings de los chunks, en el mismo orden
+            store: Escritor del almacén consolidado de embeddings
+            
+        Returns:
+            Entrada del documento para processed_documents.json
+        """
+        # Crear diccionario de metadatos sin el campo chunks original
+        clean_metadata = doc['metadata'].copy()
+        if 'chunks' in clean_metadata:
+            del clean_metadata['chunks']
+        
+        store.append(doc['metadata']['filename'], clean_metadata, chunks, embeddings)
+        
+        return {
+            "filename": doc['metadata']['filename'],
+            "metadata": clean_metadata,
+            "num_chunks": len(chunks),
+            "embedding_dim": embeddings.shape[1],
+            "sections": [chunk['section'] for chunk in chunks]
+        }
+    
+    def _process_per_document(self, documents: List[Dict[str, Any]], store: EmbeddingStoreWriter) -> List[Dict[str, Any]]:
+        """Genera los embeddings documento a documento (una llamada al modelo por documento)."""
+        processed_documents = []
+        for doc in tqdm(documents, desc="Procesando documentos"):
+            try:
+                # Dividir texto en chunks por secciones
+                chunks = self.chunk_text(doc['content'])
+                
+                # Generar embeddings para cada chunk
+                chunk_texts = [chunk['text'] for chunk in chunks]
+                embeddings = self.generate_embeddings(chunk_texts)
+                
+                processed_documents.append(self._save_document(doc, chunks, embeddings, store))
+                
+            except Exception as e:
+                self.logger.error(f"Error procesando documento {doc['metadata'].get('filename', 'desconocido')}: {str(e)}")
+                continue
+        return processed_documents
+    
+    def _process_corpus(self, documents: List[Dict[str, Any]], store: EmbeddingStoreWriter) -> List[Dict[str, Any]]:
+        """
+        Genera los embeddings de todos los documentos en lotes compartidos.
+        
+        Reúne los chunks de todos los documentos, los codifica con
+        generate_embeddings en una sola llamada y reparte los vectores a cada documento.
+        
+        Args:
+            documents: Documentos con contenido y metadatos
+            store: Escritor del almacén consolidado de embeddings
+            
+        Returns:
+            Entradas de los documentos procesados
+        """
+        # Chunks de cada documento y su rango de filas en la matriz del corpus
+        chunked = []
+        texts = []
+        for doc in documents:
+            try:
+                chunks = self.chunk_text(doc['content'])
+            except Exception as e:
+                self.logger.error(f"Error procesando documento {doc['metadata'].get('filename', 'desconocido')}: {str(e)}")
+                continue
+            chunked.append((doc, chunks, len(texts)))
+            texts.extend(chunk['text'] for chunk in chunks)
+        
+        self.logger.info(f"Codificando {len(texts)} chunks de {len(chunked)} documentos en lotes de {self.batch_size}")
+        embeddings = self.generate_embeddings(texts)
+        if self.embedding_cache is not None:
+            self.logger.info(
+                f"Caché de embeddings - Aciertos: {self.embedding_cache.hits}, fallos: {self.embedding_cache.misses}"
+            )
+        
+        processed_documents = []
+        for doc, chunks, start in tqdm(chunked, desc="Guardando documentos"):
+            try:
+                processed_documents.append(
+                    self._save_document(doc, chunks, embeddings[start:start + len(chunks)], store)
+                )
+            except Exception as e:
+                self.logger.error(f"Error procesando documento {doc['metadata'].get('filename', 'desconocido')}: {str(e)}")
+                continue
+        return processed_documents
+    
+    def process_documents(self, corpus_batching: bool = True) -> None:
         """
         Procesa los documentos para generar embeddings.
+        
+        Args:
+            corpus_batching: Si codificar los chunks de todos los documentos en
+                lotes compartidos ordenados por longitud (False = un lote por documento)
         """
+        store = None
         try:
             # Cargar documentos
             documents = self.load_documents()
             
-            # Lista para almacenar todos los documentos procesados
-            processed_documents = []
+            # Almacén consolidado: sustituye al anterior solo si el proceso termina
+            store = EmbeddingStoreWriter(self.store_path, self.store_dtype)
+            if corpus_batching:
+                processed_documents = self._process_corpus(documents, store)
+            else:
+                processed_documents = self._process_per_document(documents, store)
             
-            # Procesar cada documento
-            for doc in tqdm(documents, desc="Procesando documentos"):
-                try:
-                    # Dividir texto en chunks por secciones
-                    chunks = self.chunk_text(doc['content'])
-                    
-                    # Generar embeddings para cada chunk
-                    chunk_texts = [chunk['text'] for chunk in chunks]
-                    embeddings = self.generate_embeddings(chunk_texts)
-                    
-                    # Guardar embeddings
-                    output_file = Path("data/embeddings") / f"{doc['metadata']['filename']}.npy"
-                    output_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Guardar embeddings como array de numpy
-                    np.save(output_file, embeddings)
-                    
-                    # Guardar metadatos individuales con información de chunks
-                    metadata_file = Path("data/embeddings") / f"{doc['metadata']['filename']}.json"
-                    
-                    # Crear diccionario de metadatos sin el campo chunks original
-                    clean_metadata = doc['metadata'].copy()
-                    if 'chunks' in clean_metadata:
-                        del clean_metadata['chunks']
-                    
-                    with open(metadata_file, 'w', encoding='utf-8') as f:
-                        json.dump({
-                            "filename": doc['metadata']['filename'],
-                            "num_chunks": len(chunks),
-                            "embedding_dim": embeddings.shape[1],
-                            "metadata": clean_metadata,
-                            "chunks": chunks
-                        }, f, ensure_ascii=False, indent=2)
-                    
-                    # Agregar documento a la lista de procesados
-                    processed_documents.append({
-                        "filename": doc['metadata']['filename'],
-                        "metadata": clean_metadata,
-                        "num_chunks": len(chunks),
-                        "embedding_dim": embeddings.shape[1],
-                        "sections": [chunk['section'] for chunk in chunks]
-                    })
-                    
-                except Exception as e:
-                    self.logger.error(f"Error procesando documento {doc['metadata'].get('filename', 'desconocido')}: {str(e)}")
-                    continue
+            if processed_documents:
+                store.commit()
+                self.logger.info(
+                    f"Almacén de embeddings {self.store_path}: {store.num_rows} chunks "
+                    f"de {len(store.documents)} documentos ({self.store_dtype})"
+                )
+            else:
+                store.abort()
+            store = None
                 
             # Guardar archivo processed_documents.json
             if processed_documents:
@@ -407,16 +792,47 @@ class DocumentEmbedder:
             
         except Exception as e:
             self.logger.error(f"Error procesando documentos: {str(e)}")
+            if store is not None:
+                store.abort()
             raise
+        finally:
+            self.close()
 
 def main():
     """Función principal para ejecutar la generación de embeddings"""
+    parser = argparse.ArgumentParser(description="Genera los embeddings de los documentos")
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help="Chunks por lote al codificar el corpus")
+    parser.add_argument('--backend', choices=BACKENDS, default='torch',
+                        help="Backend de inferencia del modelo")
+    parser.add_argument('--encode-workers', type=int, default=1,
+                        help="Procesos que codifican en CPU (0 = todos los núcleos)")
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help="Hilos de inferencia por proceso (por defecto, núcleos / procesos)")
+    parser.add_argument('--store-dtype', choices=DTYPES, default='float32',
+                        help="Tipo de los vectores en el almacén de embeddings")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="No usa la caché de embeddings")
+    parser.add_argument('--cache-max-mb', type=float, default=1024,
+                        help="Tamaño máximo de la caché de embeddings, en MB")
+    parser.add_argument('--per-document', action='store_true',
+                        help="Codifica cada documento por separado en lugar de todo el corpus")
+    args = parser.parse_args()
+    
     try:
         # Inicializar el embedder
-        embedder = DocumentEmbedder()
+        embedder = DocumentEmbedder(
+            batch_size=args.batch_size,
+            cache_path=None if args.no_cache else "data/cache/embeddings.sqlite",
+            cache_max_mb=args.cache_max_mb,
+            backend=args.backend,
+            encode_workers=args.encode_workers,
+            threads_per_worker=args.threads_per_worker,
+            store_dtype=args.store_dtype
+        )
         
         # Procesar documentos
-        embedder.process_documents()
+        embedder.process_documents(corpus_batching=not args.per_document)
         
         print("\nProceso de generación de embeddings completado exitosamente")
         
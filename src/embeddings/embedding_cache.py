@@ -0,0 +1,201 @@
+"""
+Caché persistente de embeddings direccionada por contenido (SQLite).
+
+Cada vector se guarda con la clave (modelo, revisión del modelo, hash del texto
+normalizado): un chunk que no cambió entre ejecuciones, o que se repite en
+varios documentos (p. ej. las familias camion-* y camion-tractor-*), solo se
+codifica una vez. La caché tiene un tamaño máximo y, al superarlo, se eliminan
+los vectores usados hace más tiempo.
+"""
+
+import hashlib
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para calcular su clave en la caché.
+
+    Unifica la forma Unicode (NFC) y los espacios en blanco, que no cambian el
+    embedding de un chunk.
+
+    Args:
+        text: Texto del chunk
+
+    Returns:
+        Texto normalizado
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+def text_key(text: str) -> str:
+    """
+    Calcula la clave de un texto en la caché.
+
+    Args:
+        text: Texto del chunk
+
+    Returns:
+        Hash SHA-256 hexadecimal del texto normalizado
+    """
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """
+    Caché de embeddings en SQLite con expulsión por tamaño (LRU).
+    """
+
+    # Máximo de parámetros por consulta (límite de SQLite)
+    _QUERY_BATCH = 500
+
+    # Al expulsar se libera espacio hasta esta fracción del tamaño máximo
+    _EVICT_TARGET = 0.9
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model_key TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (model_key, text_hash)
+        );
+        CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        model_revision: Optional[str] = None,
+        path: str = 'data/cache/embeddings.sqlite',
+        max_size_mb: float = 1024
+    ):
+        """
+        Args:
+            model_name: Nombre del modelo que genera los embeddings
+            model_revision: Revisión (commit) del modelo; None si no se conoce
+            path: Ruta de la base de datos SQLite
+            max_size_mb: Tamaño máximo de los vectores guardados, en MB
+        """
+        self.model_key = f"{model_name}@{model_revision or 'unknown'}"
+        self.path = Path(path)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexión abierta bajo demanda (se crea el esquema si no existe)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.executescript(self._SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'EmbeddingCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Busca los embeddings de varias claves y marca los encontrados como usados.
+
+        Args:
+            keys: Claves de texto (ver text_key)
+
+        Returns:
+            Diccionario clave -> embedding de las claves presentes en la caché
+        """
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(unique), self._QUERY_BATCH):
+            batch = unique[start:start + self._QUERY_BATCH]
+            placeholders = ', '.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT text_hash, vector FROM embeddings "
+                f"WHERE model_key = ? AND text_hash IN ({placeholders})",
+                [self.model_key, *batch]
+            ).fetchall()
+            for text_hash, vector in rows:
+                found[text_hash] = np.frombuffer(vector, dtype=np.float32)
+
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model_key = ? AND text_hash = ?",
+                    [(now, self.model_key, key) for key in found]
+                )
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """
+        Guarda embeddings y expulsa los menos usados si se supera el tamaño máximo.
+
+        Args:
+            items: Pares (clave de texto, embedding)
+        """
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+            rows.append((self.model_key, key, int(np.size(vector)), blob, len(blob), now))
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model_key, text_hash, dim, vector, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self.evict()
+
+    def size_bytes(self) -> int:
+        """Tamaño total de los vectores guardados (todos los modelos), en bytes."""
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Expulsa los vectores usados hace más tiempo si se supera el tamaño máximo.
+
+        Returns:
+            Número de vectores expulsados
+        """
+        excess = self.size_bytes() - self.max_size_bytes
+        if excess <= 0:
+            return 0
+        to_free = excess + int(self.max_size_bytes * (1 - self._EVICT_TARGET))
+
+        victims: List[Tuple[str, str]] = []
+        freed = 0
+        cursor = self.conn.execute(
+            "SELECT model_key, text_hash, size FROM embeddings ORDER BY last_used"
+        )
+        for model_key, text_hash, size in cursor:
+            if freed >= to_free:
+                break
+            victims.append((model_key, text_hash))
+            freed += size
+        cursor.close()
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM embeddings WHERE model_key = ? AND text_hash = ?", victims
+            )
+        return len(victims)
@@ -0,0 +1,235 @@
+"""
+Almacén consolidado de embeddings con acceso por memory-map.
+
+En lugar de un .npy y un .json por documento, todos los embeddings se guardan
+en un único directorio:
+
+- vectors.bin: matriz float32 (o float16) de todos los chunks, fila a fila, que
+  se lee con np.memmap sin cargarla en memoria ni copiarla.
+- documents.json: tabla de documentos con la fila inicial y el número de filas
+  de cada uno, sus metadatos y el formato de la matriz.
+- chunks.jsonl: metadatos de cada chunk (texto, sección, posiciones...), una
+  línea compacta por fila de la matriz.
+
+La escritura es de solo añadir: los vectores y los chunks se añaden al final a
+medida que se procesan los documentos y la tabla se escribe al confirmar
+(commit), en un directorio temporal que sustituye al anterior. El anterior se
+aparta como <nombre>.old antes de mover el nuevo a su sitio; si el proceso se
+interrumpe entre ambos pasos, el lector usa <nombre>.old. Un proceso
+interrumpido no deja un almacén a medias ni sin almacén.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DTYPES = ('float32', 'float16')
+
+class EmbeddingStore:
+    """
+    Lector del almacén consolidado de embeddings.
+    """
+
+    VECTORS_FILE = 'vectors.bin'
+    DOCUMENTS_FILE = 'documents.json'
+    CHUNKS_FILE = 'chunks.jsonl'
+
+    def __init__(self, path: str = 'data/embeddings/store'):
+        """
+        Args:
+            path: Directorio del almacén
+        """
+        self.path = Path(path)
+        self._root: Optional[Path] = None
+        self._table: Optional[Dict[str, Any]] = None
+        self._vectors: Optional[np.memmap] = None
+        self._rows: Optional[Dict[str, Tuple[int, int]]] = None
+
+    def _committed_path(self) -> Path:
+        """
+        Directorio con el último almacén confirmado.
+
+        Si un commit se interrumpió después de apartar el almacén anterior y antes
+        de mover el nuevo, el único almacén completo es <nombre>.old.
+        """
+        if not (self.path / self.DOCUMENTS_FILE).exists():
+            old_path = self.path.with_name(self.path.name + '.old')
+            if (old_path / self.DOCUMENTS_FILE).exists():
+                return old_path
+        return self.path
+
+    def exists(self) -> bool:
+        """Indica si hay un almacén confirmado en disco."""
+        return (self._committed_path() / self.DOCUMENTS_FILE).exists()
+
+    @property
+    def table(self) -> Dict[str, Any]:
+        """Tabla de documentos y formato de la matriz (se lee una vez)."""
+        if self._table is None:
+            # Vectores y chunks se leen siempre del mismo directorio que la tabla
+            self._root = self._committed_path()
+            with open(self._root / self.DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
+                self._table = json.load(f)
+        return self._table
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        """Documentos del almacén: filename, offset, count y metadata."""
+        return self.table['documents']
+
+    @property
+    def num_rows(self) -> int:
+        """Número de chunks (filas de la matriz)."""
+        return self.table['num_rows']
+
+    @property
+    def dim(self) -> int:
+        """Dimensión de los embeddings."""
+        return self.table['dim']
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Matriz de embeddings mapeada en memoria (solo lectura, sin copia)."""
+        if self._vectors is None:
+            if self.num_rows == 0:
+                return np.zeros((0, self.dim), dtype=self.table['dtype'])
+            self._vectors = np.memmap(
+                self._root / self.VECTORS_FILE,
+                dtype=self.table['dtype'],
+                mode='r',
+                shape=(self.num_rows, self.dim)
+            )
+        return self._vectors
+
+    def get(self, filename: str) -> Optional[np.ndarray]:
+        """
+        Obtiene los embeddings de un documento.
+
+        Args:
+            filename: Nombre del documento sin extensión
+
+        Returns:
+            Vista de la matriz con las filas del documento o None si no está
+        """
+        if self._rows is None:
+            self._rows = {
+                document['filename']: (document['offset'], document['count'])
+                for document in self.documents
+            }
+        if filename not in self._rows:
+            return None
+        offset, count = self._rows[filename]
+        return self.vectors[offset:offset + count]
+
+    def iter_chunks(self) -> Iterator[Dict[str, Any]]:
+        """Recorre los metadatos de los chunks en el orden de las filas."""
+        # La tabla fija el directorio confirmado del que se leen los chunks
+        self.table
+        with open(self._root / self.CHUNKS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+class EmbeddingStoreWriter:
+    """
+    Escritor de solo añadir del almacén consolidado de embeddings.
+    """
+
+    def __init__(self, path: str = 'data/embeddings/store', dtype: str = 'float32'):
+        """
+        Args:
+            path: Directorio del almacén (se sustituye al confirmar)
+            dtype: Tipo de los vectores en disco ('float32' o 'float16')
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Tipo no soportado: {dtype}. Opciones: {', '.join(DTYPES)}")
+        self.path = Path(path)
+        self.dtype = dtype
+        self.dim: Optional[int] = None
+        self.num_rows = 0
+        self.documents: List[Dict[str, Any]] = []
+
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        if self._tmp_path.exists():
+            shutil.rmtree(self._tmp_path)
+        self._tmp_path.mkdir(parents=True)
+        self._vectors_file = open(self._tmp_path / EmbeddingStore.VECTORS_FILE, 'wb')
+        self._chunks_file = open(self._tmp_path / EmbeddingStore.CHUNKS_FILE, 'w', encoding='utf-8')
+
+    def __enter__(self) -> 'EmbeddingStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def append(
+        self,
+        filename: str,
+        metadata: Dict[str, Any],
+        chunks: List[Dict[str, Any]],
+        embeddings: np.ndarray
+    ) -> None:
+        """
+        Añade los embeddings y los chunks de un documento al final del almacén.
+
+        Args:
+            filename: Nombre del documento sin extensión
+            metadata: Metadatos del documento (sin los chunks)
+            chunks: Metadatos de cada chunk, en el orden de las filas
+            embeddings: Matriz de embeddings del documento
+        """
+        if len(chunks) != len(embeddings):
+            raise ValueError(
+                f"{filename}: {len(chunks)} chunks para {len(embeddings)} embeddings"
+            )
+        if self.dim is None:
+            self.dim = int(embeddings.shape[1])
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"{filename}: dimensión {embeddings.shape[1]} distinta de la del almacén ({self.dim})"
+            )
+
+        self._vectors_file.write(np.ascontiguousarray(embeddings, dtype=self.dtype).tobytes())
+        for chunk in chunks:
+            self._chunks_file.write(json.dumps(chunk, ensure_ascii=False) + '\n')
+        self.documents.append({
+            'filename': filename,
+            'offset': self.num_rows,
+            'count': len(embeddings),
+            'metadata': metadata
+        })
+        self.num_rows += len(embeddings)
+
+    def commit(self) -> None:
+        """Escribe la tabla de documentos y sustituye el almacén anterior."""
+        self._vectors_file.close()
+        self._chunks_file.close()
+        with open(self._tmp_path / EmbeddingStore.DOCUMENTS_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'dtype': self.dtype,
+                'dim': self.dim or 0,
+                'num_rows': self.num_rows,
+                'documents': self.documents
+            }, f, ensure_ascii=False)
+
+        old_path = self.path.with_name(self.path.name + '.old')
+        if self.path.exists():
+            if old_path.exists():
+                shutil.rmtree(old_path)
+            os.replace(self.path, old_path)
+        # Entre los dos reemplazos los lectores usan <nombre>.old
+        os.replace(self._tmp_path, self.path)
+        if old_path.exists():
+            shutil.rmtree(old_path)
+
+    def abort(self) -> None:
+        """Descarta lo escrito y deja el almacén anterior intacto."""
+        self._vectors_file.close()
+        self._chunks_file.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
@@ -0,0 +1,166 @@
+"""
+Backends de inferencia del modelo de embeddings.
+
+El mismo modelo de Sentence Transformers puede ejecutarse con:
+
+- 'torch': PyTorch en fp32 (comportamiento original).
+- 'onnx': exportado a ONNX y ejecutado con ONNX Runtime en CPU.
+- 'onnx-int8': exportado a ONNX y cuantizado dinámicamente a int8.
+
+La exportación y la cuantización se hacen una sola vez y se guardan en
+models/onnx/<modelo>; las cargas siguientes reutilizan esos archivos. El objeto
+devuelto es siempre un SentenceTransformer, por lo que encode(), el tokenizer y
+max_seq_length se usan igual sea cual sea el backend.
+"""
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+# sentence-transformers (y torch / onnxruntime) se importan al cargar el modelo
+if TYPE_CHECKING:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+def onnx_export_dir(model_name: str, onnx_dir: str = 'models/onnx') -> Path:
+    """
+    Directorio donde se guarda la exportación ONNX de un modelo.
+
+    Args:
+        model_name: Nombre del modelo de Sentence Transformers
+        onnx_dir: Directorio base de los modelos exportados
+
+    Returns:
+        Ruta del directorio del modelo exportado
+    """
+    return Path(onnx_dir) / model_name.replace('/', '__')
+
+def ensure_onnx_export(
+    model_name: str,
+    backend: str = 'onnx',
+    revision: Optional[str] = None,
+    onnx_dir: str = 'models/onnx',
+    quantization: str = 'avx2'
+) -> Path:
+    """
+    Exporta el modelo a ONNX (y lo cuantiza a int8) si aún no está exportado.
+
+    Args:
+        model_name: Nombre del modelo de Sentence Transformers
+        backend: 'onnx' u 'onnx-int8'
+        revision: Revisión del modelo en el Hub
+        onnx_dir: Directorio base de los modelos exportados a ONNX
+        quantization: Configuración de cuantización int8 de ONNX Runtime
+            ('avx2', 'avx512', 'avx512_vnni' o 'arm64')
+
+    Returns:
+        Ruta del archivo .onnx relativa al directorio del modelo exportado
+    """
+    from sentence_transformers import SentenceTransformer
+
+    export_dir = onnx_export_dir(model_name, onnx_dir)
+    if not (export_dir / 'onnx' / 'model.onnx').exists():
+        logger.info(f"Exportando {model_name} a ONNX en {export_dir}")
+        model = SentenceTransformer(model_name, device='cpu', backend='onnx', revision=revision)
+        model.save_pretrained(str(export_dir))
+
+    if backend != 'onnx-int8':
+        return Path('onnx') / 'model.onnx'
+
+    file_suffix = f'qint8_{quantization}'
+    file_name = Path('onnx') / f'model_{file_suffix}.onnx'
+    if not (export_dir / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        logger.info(f"Cuantizando {model_name} a int8 ({quantization})")
+        model = SentenceTransformer(str(export_dir), device='cpu', backend='onnx')
+        export_dynamic_quantized_onnx_model(
+            model, quantization, str(export_dir), file_suffix=file_suffix
+        )
+    return file_name
+
+def load_encoder(
+    model_name: str,
+    backend: str = 'torch',
+    device: Optional[str] = None,
+    revision: Optional[str] = None,
+    onnx_dir: str = 'models/onnx',
+    quantization: str = 'avx2',
+    num_threads: Optional[int] = None
+) -> 'SentenceTransformer':
+    """
+    Carga el modelo de embeddings con el backend indicado.
+
+    Args:
+        model_name: Nombre del modelo de Sentence Transformers
+        backend: 'torch', 'onnx' o 'onnx-int8'
+        device: Dispositivo para PyTorch (los backends ONNX usan la CPU)
+        revision: Revisión del modelo en el Hub
+        onnx_dir: Directorio base de los modelos exportados a ONNX
+        quantization: Configuración de cuantización int8 de ONNX Runtime
+            ('avx2', 'avx512', 'avx512_vnni' o 'arm64')
+        num_threads: Hilos de inferencia (None = los de la librería). Con
+            PyTorch se fija para todo el proceso
+
+    Returns:
+        Modelo SentenceTransformer listo para encode()
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no soportado: {backend}. Opciones: {', '.join(BACKENDS)}")
+
+    if backend == 'torch':
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        return SentenceTransformer(model_name, device=device, revision=revision)
+
+    file_name = ensure_onnx_export(model_name, backend, revision, onnx_dir, quantization)
+    model_kwargs = {'file_name': file_name.as_posix()}
+    if num_threads:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        model_kwargs['session_options'] = session_options
+
+    logger.info(f"Cargando {model_name} con ONNX Runtime ({file_name})")
+    return SentenceTransformer(
+        str(onnx_export_dir(model_name, onnx_dir)),
+        device='cpu',
+        backend='onnx',
+        model_kwargs=model_kwargs
+    )
+
+def encode_token_ids(model: 'SentenceTransformer', token_ids: Sequence[Sequence[int]]) -> 'np.ndarray':
+    """
+    Codifica textos ya tokenizados, sin volver a pasar por el tokenizer.
+
+    Equivale a model.encode() sobre los textos originales cuando los ids se
+    obtuvieron con el tokenizer del modelo sin tokens especiales y caben en
+    max_seq_length.
+
+    Args:
+        model: Modelo cargado con load_encoder
+        token_ids: Ids de tokens de cada texto, sin tokens especiales
+
+    Returns:
+        Matriz de embeddings, una fila por texto
+    """
+    import torch
+
+    tokenizer = model.tokenizer
+    features = tokenizer.pad(
+        {'input_ids': [tokenizer.build_inputs_with_special_tokens([int(i) for i in ids]) for ids in token_ids]},
+        padding=True,
+        return_tensors='pt'
+    )
+    features = {name: tensor.to(model.device) for name, tensor in features.items()}
+    # Como encode(): sin dropout aunque el modelo se haya dejado en modo entrenamiento
+    model.eval()
+    with torch.no_grad():
+        return model.forward(features)['sentence_embedding'].float().cpu().numpy()
@@ -0,0 +1,107 @@
+"""
+Pool de procesos para codificar embeddings en CPU.
+
+Una sola llamada a model.encode usa un proceso con los hilos intra-op de la
+librería, lo que escala mal a partir de unos pocos núcleos. El pool reparte lotes
+de textos entre varios procesos de trabajo (SupervisedPool), cada uno con su
+propia copia del modelo cargada una sola vez y un número fijo de hilos, y
+devuelve los embeddings en el mismo orden en que se enviaron los lotes.
+"""
+
+import os
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Union
+
+from src.data.worker_pool import SupervisedPool, TaskFailure
+from src.embeddings.encoder_backend import encode_token_ids, ensure_onnx_export, load_encoder
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Modelo propio de cada proceso de trabajo
+_worker_model = None
+
+def _init_worker(model_name: str, backend: str, revision: Optional[str], num_threads: int) -> None:
+    """Fija los hilos del proceso y carga el modelo una única vez."""
+    global _worker_model
+    # Antes de importar torch / onnxruntime para que OpenMP y MKL los respeten
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(num_threads)
+    _worker_model = load_encoder(
+        model_name, backend, device='cpu', revision=revision, num_threads=num_threads
+    )
+
+# Lote de textos o de ids de tokens ya calculados (sin tokens especiales)
+Batch = Union[List[str], List[Sequence[int]]]
+
+def _encode_batch(batch: Batch) -> 'np.ndarray':
+    """Codifica un lote de textos o de ids de tokens con el modelo del proceso."""
+    if batch and not isinstance(batch[0], str):
+        return encode_token_ids(_worker_model, batch)
+    return _worker_model.encode(batch, batch_size=len(batch), convert_to_numpy=True)
+
+class EncodingPool:
+    """
+    Procesos de trabajo que codifican lotes de textos en paralelo.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = 'torch',
+        n_workers: int = 2,
+        threads_per_worker: Optional[int] = None,
+        revision: Optional[str] = None,
+        task_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            model_name: Nombre del modelo de Sentence Transformers
+            backend: Backend de inferencia ('torch', 'onnx' u 'onnx-int8')
+            n_workers: Número de procesos de trabajo
+            threads_per_worker: Hilos de inferencia de cada proceso (por defecto
+                los núcleos repartidos entre los procesos)
+            revision: Revisión del modelo en el Hub
+            task_timeout: Tiempo máximo en segundos por lote (None = sin límite)
+        """
+        self.n_workers = max(1, n_workers)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.n_workers)
+
+        # La exportación ONNX se hace aquí una vez, no en cada proceso a la vez
+        if backend != 'torch':
+            ensure_onnx_export(model_name, backend, revision)
+
+        self._pool = SupervisedPool(
+            _encode_batch,
+            self.n_workers,
+            initializer=_init_worker,
+            initargs=(model_name, backend, revision, self.threads_per_worker),
+            task_timeout=task_timeout,
+            start_method='spawn'
+        )
+
+    def __enter__(self) -> 'EncodingPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def imap(self, batches: Iterable[Batch]) -> Iterator['np.ndarray']:
+        """
+        Codifica lotes de textos en los procesos de trabajo.
+
+        Los lotes se consumen a medida que hay procesos libres.
+
+        Args:
+            batches: Lotes de textos o de ids de tokens (ver encode_token_ids)
+
+        Yields:
+            Matriz de embeddings de cada lote, en el orden de entrada
+        """
+        for result in self._pool.imap(batches):
+            if isinstance(result, TaskFailure):
+                raise RuntimeError(f"Error codificando un lote de textos: {result.reason}")
+            yield result
+
+    def close(self) -> None:
+        """Detiene los procesos de trabajo."""
+        self._pool.close()
@@ -10,6 +10,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from src.data.catalog import DocumentCatalog
+from src.embeddings.embedding_store import EmbeddingStore
 from src.monitoring.performance import PerformanceMonitor
 
 class FAISSIndexBuilder:
@@ -17,28 +19,36 @@ class FAISSIndexBuilder:
     Constructor y gestor del índice FAISS.
     """
     
+    # Vectores por llamada a index.add (acota la memoria con almacenes float16)
+    ADD_BATCH_ROWS = 65536
+    
     def __init__(
         self,
         embeddings_dir: str = "data/embeddings",
         index_dir: str = "models/faiss_index",
         dimension: int = 768,  # Dimensión por defecto para mpnet
-        index_type: str = "flat"  # Tipo de índice: flat, ivf, hnsw
+        index_type: str = "flat",  # Tipo de índice: flat, ivf, hnsw
+        catalog_path: str = "data/metadata/catalog.sqlite"
     ):
         """
         Inicializa el constructor del índice.
         
         Args:
-            embeddings_dir: Directorio con los embeddings
+            embeddings_dir: Directorio con los embeddings (almacén consolidado en
+                <embeddings_dir>/store o, si no existe, un .npy/.json por documento)
             index_dir: Directorio para guardar el índice
             dimension: Dimensión de los embeddings
             index_type: Tipo de índice FAISS a construir
+            catalog_path: Catálogo de documentos con los metadatos vigentes
         """
         self.embeddings_dir = Path(embeddings_dir)
+        self.store = EmbeddingStore(self.embeddings_dir / "store")
         self.index_dir = Path(index_dir)
         self.index_dir.mkdir(parents=True, exist_ok=True)
         
         self.dimension = dimension
         self.index_type = index_type
+        self.catalog = DocumentCatalog(catalog_path)
         
         # Configurar logging simple
         self.logger = logging.getLogger("FAISSIndexBuilder")
@@ -75,11 +85,130 @@ class FAISSIndexBuilder:
         else:
             raise ValueError(f"Tipo de índice no soportado: {self.index_type}")
     
+    def _chunk_metadata(
+        self,
+        base_metadata: Dict,
+        filename: str,
+        index: int,
+        total_chunks: int,
+        embedding_dim: int,
+        chunk_info: Optional[Dict]
+    ) -> Dict:
+        """
+        Combina los metadatos base de un documento con los de uno de sus chunks.
+        
+        Args:
+            base_metadata: Metadatos del documento
+            filename: Nombre del documento
+            index: Posición del chunk en el documento
+            total_chunks: Número de chunks del documento
+            embedding_dim: Dimensión de los embeddings
+            chunk_info: Metadatos del chunk (None si no se conocen)
+            
+        Returns:
+            Metadatos del chunk para el mapeo del índice
+        """
+        chunk_metadata = base_metadata.copy()
+        chunk_metadata.update({
+            "filename": filename,
+            "chunk_index": index,
+            "total_chunks": total_chunks,
+            "embedding_dim": embedding_dim
+        })
+        
+        # IMPORTANTE: Incluir el texto real del chunk
+        if chunk_info is not None:
+            chunk_metadata.update({
+                "text": chunk_info.get("text", ""),
+                "section": chunk_info.get("section", "general"),
+                "section_title": chunk_info.get("section_title", ""),
+                "start_position": chunk_info.get("start_position", 0),
+                "end_position": chunk_info.get("end_position", 0)
+            })
+        else:
+            # Fallback si no hay información de chunk
+            chunk_metadata["text"] = ""
+            chunk_metadata["section"] = "general"
+        
+        return chunk_metadata
+    
+    def _base_metadata(self, catalog: Optional[DocumentCatalog], filename: str, metadata: Dict) -> Dict:
+        """
+        Metadatos vigentes de un documento: los del catálogo (p. ej. palabras clave
+        recalculadas) si está disponible, sin necesidad de regenerar los embeddings.
+        """
+        catalog_metadata = catalog.get(filename) if catalog else None
+        if catalog_metadata:
+            catalog_metadata.pop("chunks", None)
+            return catalog_metadata
+        return metadata
+    
     @PerformanceMonitor.function_timer("load_embeddings")
     def load_embeddings(self) -> Tuple[np.ndarray, List[Dict]]:
         """
         Carga los embeddings y sus metadatos.
         
+        Con el almacén consolidado la matriz se devuelve mapeada en memoria, sin
+        copiarla; si no existe se leen los .npy/.json de cada documento.
+        
+        Returns:
+            Tupla con matriz de embeddings y lista de metadatos
+        """
+        catalog = self.catalog if self.catalog.exists() else None
+        try:
+            if self.store.exists():
+                embeddings_matrix, all_metadata = self._load_from_store(catalog)
+            else:
+                embeddings_matrix, all_metadata = self._load_from_files(catalog)
+        finally:
+            if catalog:
+                catalog.close()
+        
+        # Verificar dimensiones
+        if embeddings_matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Dimensión de embeddings ({embeddings_matrix.shape[1]}) "
+                f"no coincide con la esperada ({self.dimension})"
+            )
+        
+        return embeddings_matrix, all_metadata
+    
+    def _load_from_store(self, catalog: Optional[DocumentCatalog]) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Carga los embeddings del almacén consolidado.
+        
+        Args:
+            catalog: Catálogo de documentos abierto (None si no existe)
+            
+        Returns:
+            Tupla con la matriz mapeada en memoria y la lista de metadatos
+        """
+        if self.store.num_rows == 0:
+            raise ValueError("No se encontraron embeddings válidos")
+        
+        chunks = self.store.iter_chunks()
+        all_metadata = []
+        for document in self.store.documents:
+            filename = document["filename"]
+            base_metadata = self._base_metadata(catalog, filename, document["metadata"])
+            for i in range(document["count"]):
+                all_metadata.append(self._chunk_metadata(
+                    base_metadata, filename, i, document["count"], self.store.dim, next(chunks)
+                ))
+        
+        self.logger.info(
+            f"Cargado almacén {self.store.path}: {len(self.store.documents)} documentos, "
+            f"{self.store.num_rows} chunks ({self.store.table['dtype']}, memory-map)"
+        )
+        return self.store.vectors, all_metadata
+    
+    def _load_from_files(self, catalog: Optional[DocumentCatalog]) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Carga los embeddings de los archivos .npy/.json de cada documento.
+        
+        Args:
+            catalog: Catálogo de documentos abierto (None si no existe)
+            
         Returns:
             Tupla con matriz de embeddings y lista de metadatos
         """
@@ -108,36 +237,20 @@ class FAISSIndexBuilder:
                 
                 # Obtener chunks del metadata
                 chunks = metadata.get("chunks", [])
-                base_metadata = metadata.get("metadata", {})
+                filename = metadata.get("filename", "")
+                base_metadata = self._base_metadata(catalog, filename, metadata.get("metadata", {}))
                 
                 # Crear entrada de metadatos para cada embedding/chunk
                 num_embeddings = len(embeddings)
                 for i in range(num_embeddings):
-                    # Combinar metadatos base con información del chunk específico
-                    chunk_metadata = base_metadata.copy()
-                    chunk_metadata.update({
-                        "filename": metadata.get("filename", ""),
-                        "chunk_index": i,
-                        "total_chunks": num_embeddings,
-                        "embedding_dim": metadata.get("embedding_dim", embeddings.shape[1])
-                    })
-                    
-                    # IMPORTANTE: Incluir el texto real del chunk
-                    if i < len(chunks):
-                        chunk_info = chunks[i]
-                        chunk_metadata.update({
-                            "text": chunk_info.get("text", ""),
-                            "section": chunk_info.get("section", "general"),
-                            "section_title": chunk_info.get("section_title", ""),
-                            "start_position": chunk_info.get("start_position", 0),
-                            "end_position": chunk_info.get("end_position", 0)
-                        })
-                    else:
-                        # Fallback si no hay información de chunk
-                        chunk_metadata["text"] = ""
-                        chunk_metadata["section"] = "general"
-                        
-                    all_metadata.append(chunk_metadata)
+                    all_metadata.append(self._chunk_metadata(
+                        base_metadata,
+                        filename,
+                        i,
+                        num_embeddings,
+                        metadata.get("embedding_dim", embeddings.shape[1]),
+                        chunks[i] if i < len(chunks) else None
+                    ))
                 
                 self.logger.info(f"Cargado: {emb_file.name} - {num_embeddings} chunks con texto")
                 
@@ -151,13 +264,6 @@ class FAISSIndexBuilder:
         # Concatenar todos los embeddings
         embeddings_matrix = np.vstack(all_embeddings)
         
-        # Verificar dimensiones
-        if embeddings_matrix.shape[1] != self.dimension:
-            raise ValueError(
-                f"Dimensión de embeddings ({embeddings_matrix.shape[1]}) "
-                f"no coincide con la esperada ({self.dimension})"
-            )
-        
         self.logger.info(
             f"Cargados {len(all_embeddings)} archivos, "
             f"{embeddings_matrix.shape[0]} chunks totales con texto incluido"
@@ -179,10 +285,12 @@ class FAISSIndexBuilder:
             
             # Entrenar si es necesario (IVF)
             if isinstance(index, faiss.IndexIVFFlat):
-                index.train(embeddings)
+                index.train(np.ascontiguousarray(embeddings, dtype=np.float32))
             
-            # Agregar vectores al índice
-            index.add(embeddings)
+            # Agregar vectores al índice por bloques: con float32 cada bloque es
+            # una vista del memory-map y con float16 solo se convierte el bloque
+            for start in range(0, len(embeddings), self.ADD_BATCH_ROWS):
+                index.add(np.ascontiguousarray(embeddings[start:start + self.ADD_BATCH_ROWS], dtype=np.float32))
             
             # Actualizar mapeo de IDs
             for i, meta in enumerate(metadata):
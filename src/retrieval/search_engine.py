@@ -8,9 +8,9 @@ import faiss
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from sentence_transformers import SentenceTransformer
 import time
 
+from src.embeddings.encoder_backend import load_encoder
 from src.monitoring.performance import PerformanceMonitor
 
 class SearchEngine:
@@ -22,7 +22,8 @@ class SearchEngine:
         self,
         model_name: str = "paraphrase-multilingual-mpnet-base-v2",
         index_dir: str = "models/faiss_index",
-        top_k: int = 5
+        top_k: int = 5,
+        backend: str = "torch"
     ):
         """
         Inicializa el motor de búsqueda.
@@ -31,8 +32,9 @@ class SearchEngine:
             model_name: Nombre del modelo de embeddings
             index_dir: Directorio con el índice FAISS
             top_k: Número de resultados a retornar
+            backend: Backend de inferencia ('torch', 'onnx' u 'onnx-int8')
         """
-        self.model = SentenceTransformer(model_name)
+        self.model = load_encoder(model_name, backend)
         self.index_dir = Path(index_dir)
         self.top_k = top_k
         
@@ -10,8 +10,8 @@ from typing import List, Dict, Any
 import numpy as np
 import faiss
 import torch
-from sentence_transformers import SentenceTransformer
 
+from src.embeddings.encoder_backend import load_encoder
 from src.monitoring.logger import RAGLogger
 from src.monitoring.performance import PerformanceMonitor
 
@@ -36,7 +36,8 @@ class DocumentSearcher:
         index_dir: str = "models/faiss_index",
         model_name: str = "all-MiniLM-L6-v2",
         device: str = None,
-        top_k: int = 5
+        top_k: int = 5,
+        backend: str = "torch"
     ):
         """
         Inicializa el buscador de documentos.
@@ -46,18 +47,21 @@ class DocumentSearcher:
             model_name: Nombre del modelo de Sentence Transformers
             device: Dispositivo a usar (cuda/cpu)
             top_k: Número de resultados a retornar
+            backend: Backend de inferencia ('torch', 'onnx' u 'onnx-int8')
         """
         self.index_dir = Path(index_dir)
         self.top_k = top_k
         
-        # Determinar dispositivo
-        if device is None:
+        # Determinar dispositivo (los backends ONNX se ejecutan en CPU)
+        if backend != "torch":
+            self.device = "cpu"
+        elif device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
             
         # Cargar modelo
-        self.model = SentenceTransformer(model_name, device=self.device)
+        self.model = load_encoder(model_name, backend, device=self.device)
         
         # Inicializar logger y monitor
         self.logger = RAGLogger()
@@ -71,6 +75,7 @@ class DocumentSearcher:
             "Inicializado DocumentSearcher",
             model=model_name,
             device=self.device,
+            backend=backend,
             top_k=top_k
         )
     
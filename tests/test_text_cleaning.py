@@ -0,0 +1,36 @@
+"""
+Salidas doradas del motor de limpieza de texto.
+
+Los pares se generaron con la implementación original línea a línea
+(``legacy_clean_text`` en scripts/benchmark_clean_text.py); si alguno falla, la
+limpieza ha dejado de ser equivalente a la original.
+"""
+
+import pytest
+
+from src.data.text_cleaning import clean_text
+
+GOLDEN = [
+    ("", ""),
+    ("¿Qué se asegura?\r\n• Responsabilidad civil obligatoria",
+     "¿Qué se asegura?\nResponsabilidad civil obligatoria"),
+    ("seguroDe Automóvil", "seguro De Automóvil"),
+    ("cobertura   Básica", "cobertura Básica"),
+    ("Hasta 300 € por siniestro", "Hasta 300 por siniestro"),
+    ("Franquicia de 150€ 00 y prima anual", "Franquicia de 150 00 y prima anual"),
+    ("Artículo12 del contrato3a", "Artículo 12 del contrato 3 a"),
+    ("( daños propios )  y lunas - robo", "(daños propios) y lunas-robo"),
+    ("Fallecimiento , invalidez ; asistencia : viaje ! ¿ Dónde ?",
+     "Fallecimiento, invalidez; asistencia: viaje!¿ Dónde?"),
+    ("Línea 1\n\n\n\nLínea 2\r\rLínea 3", "Línea 1\n\nLínea 2\n\nLínea 3"),
+    ('Texto con * asteriscos / barras "comillas" y _guiones_',
+     "Texto con asteriscos barras comillas y _guiones_"),
+    ("   espacios\t\ty tabuladores   ", "espacios y tabuladores"),
+    ("Allianz Seguros y Reaseguros S.A.\x0bPágina 1 de 4",
+     "Allianz Seguros y Reaseguros S.A. Página 1 de 4"),
+    ("ÁÉÍÓÚ ñandú PÓLIZA25€ aBc", "ÁÉÍÓÚ ñandú PÓLIZA 25 a Bc"),
+]
+
+@pytest.mark.parametrize("text, expected", GOLDEN)
+def test_clean_text_matches_legacy_output(text, expected):
+    assert clean_text(text) == expected